@@ -1,11 +1,21 @@
+import time
+
+# Recorded before the heavier imports so startup timings include them
+BOOT_TIME = time.perf_counter()
+
 import os
+import hmac
 import logging
-from flask import Flask, request, jsonify, send_from_directory, render_template
+import threading
+from flask import Flask, request, jsonify, send_from_directory, render_template, g
 from werkzeug.utils import secure_filename
-from models.resume_analyzer import ResumeAnalyzer
+from models.resume_analyzer import MODES, ResumeAnalyzer
+from models.profiler import (
+    DEFAULT_MAX_AGE, DEFAULT_MAX_PROFILES, ProfileStore, SamplingProfiler, is_valid_request_id, new_request_id
+)
+from models.serialization import dumps_json
 import json
 from datetime import datetime
-import spacy
 import tempfile
 
 # Configure logging
@@ -15,20 +25,165 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__, static_folder='static', static_url_path='/static')
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
-# Initialize ResumeAnalyzer
-try:
-    logger.info("Loading spaCy model...")
-    nlp = spacy.load('en_core_web_sm')
-    logger.info("SpaCy model loaded successfully!")
-except OSError:
-    logger.warning("SpaCy model not found. Downloading...")
-    spacy.cli.download('en_core_web_sm')
-    nlp = spacy.load('en_core_web_sm')
-    logger.info("SpaCy model downloaded and loaded successfully!")
-
-# Initialize analyzer without passing nlp
-analyzer = ResumeAnalyzer()
-logger.info("ResumeAnalyzer initialized successfully!")
+# Per-request profiling is opt-in: the client sends `X-Profile: 1` and the
+# server must either have PROFILING_ENABLED set or receive the admin token
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '').lower() in ('1', 'true', 'yes')
+PROFILE_TOKEN = os.environ.get('PROFILE_TOKEN')
+# Traces are kept under server-generated IDs, at most PROFILE_MAX_COUNT of
+# them and none older than PROFILE_MAX_AGE seconds
+profile_store = ProfileStore(
+    os.environ.get('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'scanlytic-profiles')),
+    max_profiles=int(os.environ.get('PROFILE_MAX_COUNT', DEFAULT_MAX_PROFILES)),
+    max_age=float(os.environ.get('PROFILE_MAX_AGE', DEFAULT_MAX_AGE))
+)
+
+# Nothing is loaded at import time. The models load in a background thread
+# started by the ASGI lifespan startup, or by the first request when there
+# is no lifespan. With STARTUP_MODE=eager the lifespan startup waits for
+# the models, so the server only starts serving once they are loaded. In
+# either mode, WARMUP also runs one synthetic analysis before the app
+# reports ready.
+STARTUP_MODE = os.environ.get('STARTUP_MODE', 'lazy').lower()
+WARMUP_ENABLED = os.environ.get('WARMUP', 'true').lower() in ('1', 'true', 'yes')
+
+startup_timings = {
+    'startup_mode': STARTUP_MODE,
+    'boot_seconds': None,
+    'time_to_ready_seconds': None,
+    'time_to_first_byte_seconds': None
+}
+_timings_lock = threading.Lock()
+# Set by load_analyzer() after the warm-up has run or failed (or been skipped)
+_warmed_up = threading.Event()
+_loader = None
+_loader_lock = threading.Lock()
+
+def seconds_since_boot():
+    return round(time.perf_counter() - BOOT_TIME, 3)
+
+def is_ready():
+    """True once the models are loaded and, with WARMUP on, the warm-up has run"""
+    return analyzer.is_ready and _warmed_up.is_set()
+
+def mark_ready():
+    """Record the time-to-ready the first time the app is ready"""
+    with _timings_lock:
+        if startup_timings['time_to_ready_seconds'] is None and is_ready():
+            startup_timings['time_to_ready_seconds'] = seconds_since_boot()
+            logger.info(f"Analyzer ready after {startup_timings['time_to_ready_seconds']}s")
+
+def load_analyzer():
+    """Load the models, then optionally warm up the pipeline"""
+    try:
+        logger.info("Loading ResumeAnalyzer models...")
+        analyzer.load_nlp()
+        analyzer.load_and_train_model()
+    except Exception as e:
+        logger.error(f"Model loading failed: {str(e)}")
+        return
+    if WARMUP_ENABLED:
+        try:
+            logger.info("Warming up ResumeAnalyzer...")
+            analyzer.warm_up()
+        except Exception as e:
+            logger.error(f"Warm-up failed: {str(e)}")
+    _warmed_up.set()
+    mark_ready()
+
+def start_analyzer(wait=False):
+    """Start loading the models in the background, once; with wait=True, block until done"""
+    global _loader
+    with _loader_lock:
+        if _loader is None:
+            # Readiness must not depend on traffic: a quick-mode request never loads spaCy
+            _loader = threading.Thread(target=load_analyzer, name='analyzer-load', daemon=True)
+            _loader.start()
+        loader = _loader
+    if wait:
+        loader.join()
+
+# Initialize ResumeAnalyzer; with lazy=True this loads nothing yet
+analyzer = ResumeAnalyzer(lazy=True)
+logger.info(f"ResumeAnalyzer initialized successfully! (startup mode: {STARTUP_MODE})")
+
+startup_timings['boot_seconds'] = seconds_since_boot()
+logger.info(f"App booted in {startup_timings['boot_seconds']}s")
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    start_analyzer()
+
+@app.after_request
+def record_request_timing(response):
+    """Add a Server-Timing header and record the first real response"""
+    start = g.get('request_start')
+    if start is not None:
+        duration_ms = (time.perf_counter() - start) * 1000
+        response.headers['Server-Timing'] = f"app;dur={duration_ms:.1f}"
+    if request.path not in ('/healthz', '/readyz'):
+        with _timings_lock:
+            if startup_timings['time_to_first_byte_seconds'] is None:
+                startup_timings['time_to_first_byte_seconds'] = seconds_since_boot()
+                logger.info(f"First response after {startup_timings['time_to_first_byte_seconds']}s")
+    return response
+
+ALLOWED_EXTENSIONS = ('.pdf', '.docx')
+
+def profiling_allowed(headers=None):
+    """Check whether the caller may profile requests or download traces"""
+    if PROFILING_ENABLED:
+        return True
+    headers = request.headers if headers is None else headers
+    token = headers.get('X-Profile-Token', '')
+    return bool(PROFILE_TOKEN) and hmac.compare_digest(token, PROFILE_TOKEN)
+
+def profiling_requested(headers=None):
+    """Check whether the current request asked to be profiled"""
+    headers = request.headers if headers is None else headers
+    flag = headers.get('X-Profile', '').lower() in ('1', 'true', 'yes')
+    return flag and profiling_allowed(headers)
+
+def request_id_from(headers):
+    """Use the caller's X-Request-ID when it is safe, otherwise make one up"""
+    request_id = headers.get('X-Request-ID', '')
+    return request_id if is_valid_request_id(request_id) else new_request_id()
+
+def run_analysis(filepath, request_id, profile=False, content_hash=None, mode='full'):
+    """Analyze a saved upload and return the JSON response body as bytes"""
+    logger.info(f"Starting {mode} resume analysis (request {request_id})")
+    profiler = None
+    if profile:
+        logger.info(f"Profiling request {request_id}")
+        profiler = SamplingProfiler()
+        with profiler:
+            result = analyzer.analyze_resume(filepath, content_hash, mode)
+    else:
+        result = analyzer.analyze_resume(filepath, content_hash, mode)
+    logger.info("Resume analysis completed successfully")
+    mark_ready()
+    
+    extra = None
+    if profiler is not None:
+        profile = profile_store.save(profiler, request_id)
+        profile['download_url'] = f"/profiles/{profile['profile_id']}"
+        extra = {'profile': profile}
+    return dumps_json(result, extra)
+
+@app.route('/healthz')
+def healthz():
+    """Liveness probe: the process is up and serving requests"""
+    return jsonify({"status": "ok", "uptime_seconds": seconds_since_boot()})
+
+@app.route('/readyz')
+def readyz():
+    """Readiness probe: models are loaded and analyses will be fast"""
+    mark_ready()
+    ready = is_ready()
+    payload = dict(startup_timings, ready=ready)
+    if not ready:
+        return jsonify(dict(payload, status="starting")), 503
+    return jsonify(dict(payload, status="ready"))
 
 @app.route('/')
 def index():
@@ -60,19 +215,24 @@ def analyze_resume():
         logger.error("No file selected")
         return jsonify({"error": "No file selected"}), 400
     
-    if not file.filename.endswith(('.pdf', '.docx')):
+    if not file.filename.endswith(ALLOWED_EXTENSIONS):
         logger.error(f"Invalid file type: {file.filename}")
         return jsonify({"error": "Invalid file type. Please upload a PDF or DOCX file"}), 400
     
+    # mode=quick skips spaCy for fast, approximate triage
+    mode = request.args.get('mode', 'full')
+    if mode not in MODES:
+        logger.error(f"Invalid analysis mode: {mode}")
+        return jsonify({"error": f"Invalid mode. Use one of: {', '.join(MODES)}"}), 400
+    
     try:
         # Create a temporary file
         with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as temp_file:
             filepath = temp_file.name
             file.save(filepath)
         
-        logger.info("Starting resume analysis")
-        result = analyzer.analyze_resume(filepath)
-        logger.info("Resume analysis completed successfully")
+        request_id = request_id_from(request.headers)
+        body = run_analysis(filepath, request_id, profile=profiling_requested(), mode=mode)
         
         # Clean up the temporary file
         try:
@@ -81,7 +241,9 @@ def analyze_resume():
         except Exception as e:
             logger.warning(f"Failed to clean up file {filepath}: {str(e)}")
         
-        return jsonify(result)
+        response = app.response_class(body, mimetype='application/json')
+        response.headers['X-Request-ID'] = request_id
+        return response
     
     except Exception as e:
         logger.error(f"Error during resume analysis: {str(e)}")
@@ -131,8 +293,34 @@ def download_report():
         logger.error(f"Error generating report: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/profiles/<profile_id>', methods=['GET'])
+def download_profile(profile_id):
+    """Download the folded-stack trace of a profiled request"""
+    if not profiling_allowed():
+        return jsonify({"error": "Profiling is not enabled"}), 403
+    
+    if request.args.get('format') == 'json':
+        summary = profile_store.load_summary(profile_id)
+        if summary is None:
+            return jsonify({"error": "Profile not found"}), 404
+        return jsonify(summary)
+    
+    path = profile_store.folded_path(profile_id)
+    if path is None:
+        return jsonify({"error": "Profile not found"}), 404
+    
+    logger.info(f"Serving profile {profile_id}")
+    return send_from_directory(
+        os.path.dirname(path),
+        os.path.basename(path),
+        as_attachment=True,
+        download_name=f"{profile_id}.folded",
+        mimetype='text/plain'
+    )
+
 # For local development
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     logger.info(f"Starting server on port {port}")
+    start_analyzer(wait=STARTUP_MODE == 'eager')
     app.run(host='0.0.0.0', port=port) 
\ No newline at end of file
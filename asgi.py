@@ -0,0 +1,389 @@
+"""Async front-end for Scanlytic.
+
+Uploads to POST /analyze are received on the event loop: the multipart
+body is parsed as it streams in, written to a temporary file and hashed on
+the fly, and MAX_CONTENT_LENGTH is enforced before the whole body has
+arrived. File data is buffered and written in UPLOAD_WRITE_BUFFER sized
+blocks off the event loop. At most MAX_UPLOADS bodies are received at
+once; uploads that stall for UPLOAD_IDLE_TIMEOUT seconds, or take longer
+than UPLOAD_TIMEOUT in total, are answered with 408. Only a complete
+upload is handed to a bounded pool of analysis threads, so slow clients
+hold a cheap coroutine rather than a worker.
+Every other route is served by the Flask app in app.py. The models start
+loading on lifespan startup (see app.start_analyzer), not on import.
+
+Run with:
+    uvicorn asgi:app
+    gunicorn asgi:app -k uvicorn.workers.UvicornWorker
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+from asgiref.wsgi import WsgiToAsgi
+from werkzeug.datastructures import Headers
+from werkzeug.utils import secure_filename
+
+import app as flask_app
+
+logger = logging.getLogger(__name__)
+
+MAX_CONTENT_LENGTH = flask_app.app.config['MAX_CONTENT_LENGTH']
+# Analyses running at once, and the most that may be running or waiting
+COMPUTE_WORKERS = int(os.environ.get('COMPUTE_WORKERS', 2))
+COMPUTE_QUEUE = int(os.environ.get('COMPUTE_QUEUE', 8))
+MAX_HEADER_SIZE = 16 * 1024
+# Seconds an upload may go without sending data, and may take in total
+UPLOAD_IDLE_TIMEOUT = float(os.environ.get('UPLOAD_IDLE_TIMEOUT', 15))
+UPLOAD_TIMEOUT = float(os.environ.get('UPLOAD_TIMEOUT', 120))
+# Uploads being received at once, and the bytes buffered before each disk write
+MAX_UPLOADS = int(os.environ.get('MAX_UPLOADS', 16))
+UPLOAD_WRITE_BUFFER = 256 * 1024
+
+executor = ThreadPoolExecutor(max_workers=COMPUTE_WORKERS, thread_name_prefix='analysis')
+wsgi_app = WsgiToAsgi(flask_app.app)
+
+
+class UploadError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class MultipartParser:
+    """Incremental multipart/form-data parser.
+
+    Feed it body chunks as they arrive; it calls on_part_begin(headers),
+    on_part_data(data) and on_part_end() for each part without buffering
+    more than one boundary's worth of a part's body.
+    """
+
+    PREAMBLE, AFTER_BOUNDARY, HEADERS, BODY, DONE = range(5)
+
+    def __init__(self, boundary, on_part_begin, on_part_data, on_part_end):
+        self.first_delimiter = b'--' + boundary
+        self.delimiter = b'\r\n--' + boundary
+        self.on_part_begin = on_part_begin
+        self.on_part_data = on_part_data
+        self.on_part_end = on_part_end
+        self.state = self.PREAMBLE
+        self.buffer = bytearray()
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        while self._step():
+            pass
+
+    def finish(self):
+        if self.state != self.DONE:
+            raise UploadError(400, "Incomplete multipart body")
+
+    def _step(self):
+        """Advance the state machine once; return False when more data is needed"""
+        buffer = self.buffer
+        if self.state == self.PREAMBLE:
+            index = buffer.find(self.first_delimiter)
+            if index < 0:
+                # Keep enough bytes to match a delimiter split across chunks
+                del buffer[:max(0, len(buffer) - len(self.first_delimiter))]
+                return False
+            del buffer[:index + len(self.first_delimiter)]
+            self.state = self.AFTER_BOUNDARY
+            return True
+
+        if self.state == self.AFTER_BOUNDARY:
+            if len(buffer) < 2:
+                return False
+            if buffer[:2] == b'--':
+                self.state = self.DONE
+            elif buffer[:2] == b'\r\n':
+                self.state = self.HEADERS
+            else:
+                raise UploadError(400, "Malformed multipart boundary")
+            del buffer[:2]
+            return self.state != self.DONE
+
+        if self.state == self.HEADERS:
+            index = buffer.find(b'\r\n\r\n')
+            if index < 0:
+                if len(buffer) > MAX_HEADER_SIZE:
+                    raise UploadError(400, "Multipart headers too large")
+                return False
+            headers = Headers()
+            for line in bytes(buffer[:index]).decode('utf-8', 'replace').split('\r\n'):
+                name, _, value = line.partition(':')
+                headers.add(name.strip(), value.strip())
+            del buffer[:index + 4]
+            self.on_part_begin(headers)
+            self.state = self.BODY
+            return True
+
+        if self.state == self.BODY:
+            index = buffer.find(self.delimiter)
+            if index < 0:
+                safe = len(buffer) - len(self.delimiter) + 1
+                if safe > 0:
+                    self.on_part_data(bytes(buffer[:safe]))
+                    del buffer[:safe]
+                return False
+            if index:
+                self.on_part_data(bytes(buffer[:index]))
+            del buffer[:index + len(self.delimiter)]
+            self.on_part_end()
+            self.state = self.AFTER_BOUNDARY
+            return True
+
+        # DONE: ignore the epilogue
+        buffer.clear()
+        return False
+
+
+def parse_options(value):
+    """Split a header like 'form-data; name="file"' into ('form-data', {'name': 'file'})"""
+    main, _, rest = value.partition(';')
+    options = {}
+    for match in re.finditer(r'([\w*-]+)\s*=\s*(?:"((?:[^"\\]|\\.)*)"|([^;\s]+))', rest):
+        options[match.group(1).lower()] = match.group(2) if match.group(2) is not None else match.group(3)
+    return main.strip().lower(), options
+
+
+class UploadReceiver:
+    """Collect the 'file' field of a multipart upload into a hashed temp file.
+
+    The parser callbacks only buffer and hash the data; flush() writes the
+    buffer to disk in the default executor, so the event loop never blocks
+    on file I/O.
+    """
+
+    def __init__(self):
+        self.filename = None
+        self.filepath = None
+        self.size = 0
+        self.digest = hashlib.sha256()
+        self._file = None
+        self._suffix = None
+        self._pending = bytearray()
+        self._in_file_part = False
+
+    def on_part_begin(self, headers):
+        _, options = parse_options(headers.get('Content-Disposition', ''))
+        self._in_file_part = options.get('name') == 'file' and self.filename is None
+        if not self._in_file_part:
+            return
+        self.filename = options.get('filename', '')
+        if self.filename == '':
+            return
+        if not self.filename.endswith(flask_app.ALLOWED_EXTENSIONS):
+            raise UploadError(400, "Invalid file type. Please upload a PDF or DOCX file")
+        self._suffix = os.path.splitext(secure_filename(self.filename))[1]
+
+    def on_part_data(self, data):
+        if self._in_file_part and self._suffix is not None:
+            self._pending += data
+            self.digest.update(data)
+            self.size += len(data)
+
+    def on_part_end(self):
+        self._in_file_part = False
+
+    async def flush(self, final=False):
+        """Write the buffered data once there is enough of it, or all of it when final"""
+        if self._suffix is None or not (final or len(self._pending) >= UPLOAD_WRITE_BUFFER):
+            return
+        data = bytes(self._pending)
+        self._pending.clear()
+        await asyncio.get_running_loop().run_in_executor(None, self._write, data, final)
+
+    def _write(self, data, close):
+        if self._file is None:
+            self._file = tempfile.NamedTemporaryFile(delete=False, suffix=self._suffix)
+            self.filepath = self._file.name
+        self._file.write(data)
+        if close:
+            self._file.close()
+
+    def cleanup(self):
+        if self._file is not None and not self._file.closed:
+            self._file.close()
+        if self.filepath and os.path.exists(self.filepath):
+            try:
+                os.remove(self.filepath)
+            except OSError as e:
+                logger.warning(f"Failed to clean up file {self.filepath}: {str(e)}")
+
+
+class Slots:
+    """Bound the number of requests in a stage, such as receiving or analysis"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_use = 0
+
+    @property
+    def full(self):
+        return self.in_use >= self.limit
+
+    def try_acquire(self):
+        # Only touched from the event loop thread, so no lock is needed
+        if self.in_use >= self.limit:
+            return False
+        self.in_use += 1
+        return True
+
+    def release(self):
+        self.in_use -= 1
+
+
+# Analyses that are running or waiting for a thread
+compute_slots = Slots(COMPUTE_QUEUE)
+upload_slots = Slots(MAX_UPLOADS)
+
+
+async def send_json(send, status, body, headers=()):
+    if not isinstance(body, bytes):
+        body = json.dumps(body).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]
+                   + [(name.encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def receive_upload(receive, headers):
+    """Stream the request body through the multipart parser"""
+    content_length = headers.get('Content-Length', type=int)
+    if content_length is not None and content_length > MAX_CONTENT_LENGTH:
+        raise UploadError(413, "File too large")
+
+    mimetype, options = parse_options(headers.get('Content-Type', ''))
+    if mimetype != 'multipart/form-data' or not options.get('boundary'):
+        raise UploadError(400, "No file uploaded")
+
+    upload = UploadReceiver()
+    parser = MultipartParser(options['boundary'].encode('latin-1'),
+                             upload.on_part_begin, upload.on_part_data, upload.on_part_end)
+    received = 0
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + UPLOAD_TIMEOUT
+    try:
+        while True:
+            # A client trickling bytes would otherwise hold its coroutine,
+            # temp file and descriptor open indefinitely
+            timeout = min(UPLOAD_IDLE_TIMEOUT, deadline - loop.time())
+            try:
+                message = await asyncio.wait_for(receive(), max(timeout, 0))
+            except asyncio.TimeoutError:
+                raise UploadError(408, "Upload timed out") from None
+            if message['type'] == 'http.disconnect':
+                raise UploadError(400, "Client disconnected")
+            chunk = message.get('body', b'')
+            received += len(chunk)
+            # Checked as bytes arrive, so a lying or missing Content-Length can't get past it
+            if received > MAX_CONTENT_LENGTH:
+                raise UploadError(413, "File too large")
+            parser.feed(chunk)
+            await upload.flush()
+            if not message.get('more_body', False):
+                break
+        parser.finish()
+        await upload.flush(final=True)
+    except Exception:
+        upload.cleanup()
+        raise
+    return upload
+
+
+async def analyze(scope, receive, send):
+    """Async version of app.analyze_resume"""
+    logger.info("Received resume analysis request")
+    headers = Headers([(k.decode('latin-1'), v.decode('latin-1')) for k, v in scope['headers']])
+    request_id = flask_app.request_id_from(headers)
+
+    # mode=quick skips spaCy for fast, approximate triage
+    query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    mode = query.get('mode', ['full'])[-1]
+    if mode not in flask_app.MODES:
+        await send_json(send, 400, {"error": f"Invalid mode. Use one of: {', '.join(flask_app.MODES)}"})
+        return
+
+    # Turn requests away before reading a body that could not be analyzed yet
+    if compute_slots.full:
+        logger.warning("Analysis queue is full")
+        await send_json(send, 503, {"error": "Server is busy, please retry shortly"}, [('Retry-After', '5')])
+        return
+    if not upload_slots.try_acquire():
+        logger.warning("Too many uploads in progress")
+        await send_json(send, 503, {"error": "Server is busy, please retry shortly"}, [('Retry-After', '5')])
+        return
+
+    try:
+        upload = await receive_upload(receive, headers)
+    except UploadError as e:
+        logger.error(f"Rejected upload: {e.message}")
+        await send_json(send, e.status, {"error": e.message})
+        return
+    finally:
+        upload_slots.release()
+
+    try:
+        if upload.filename is None:
+            await send_json(send, 400, {"error": "No file uploaded"})
+            return
+        if upload.filename == '':
+            await send_json(send, 400, {"error": "No file selected"})
+            return
+
+        # Checked again, as the queue may have filled while the body arrived
+        if not compute_slots.try_acquire():
+            logger.warning("Analysis queue is full")
+            await send_json(send, 503, {"error": "Server is busy, please retry shortly"}, [('Retry-After', '5')])
+            return
+        try:
+            loop = asyncio.get_running_loop()
+            body = await loop.run_in_executor(
+                executor, flask_app.run_analysis, upload.filepath, request_id,
+                flask_app.profiling_requested(headers), upload.digest.hexdigest(), mode
+            )
+        finally:
+            compute_slots.release()
+        await send_json(send, 200, body, [('X-Request-ID', request_id)])
+    except Exception as e:
+        logger.error(f"Error during resume analysis: {str(e)}")
+        await send_json(send, 500, {"error": str(e)})
+    finally:
+        upload.cleanup()
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            # With STARTUP_MODE=eager, startup completes once the models are loaded
+            await asyncio.get_running_loop().run_in_executor(
+                None, flask_app.start_analyzer, flask_app.STARTUP_MODE == 'eager'
+            )
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            executor.shutdown(wait=False, cancel_futures=True)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+    elif scope['type'] == 'http' and scope['method'] == 'POST' and scope['path'] == '/analyze':
+        # For servers run without lifespan events
+        flask_app.start_analyzer()
+        await analyze(scope, receive, send)
+    else:
+        await wsgi_app(scope, receive, send)
@@ -28,6 +28,14 @@ python -m spacy download en_core_web_sm
 echo "Verifying spaCy model..."
 python -c "import spacy; nlp = spacy.load('en_core_web_sm'); print('SpaCy model loaded successfully!')"
 
+# Convert the training dataset to the memory-mapped columnar format
+echo "Converting resume dataset..."
+python -m models.corpus convert UpdatedResumeDataSet.csv UpdatedResumeDataSet.corpus
+
+# Fit the category classifier once so workers load it instead of refitting on boot
+echo "Fitting category classifier..."
+python -m models.corpus train-model
+
 # Print directory structure
 echo "Current directory structure:"
 ls -la
@@ -0,0 +1,108 @@
+import argparse
+import socket
+import statistics
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+
+def slow_upload(host, port, stop_event, chunk_delay, stats):
+    """Start an upload and trickle its body one small chunk at a time"""
+    boundary = 'slowclientboundary'
+    body_size = 1024 * 1024
+    try:
+        sock = socket.create_connection((host, port), timeout=10)
+        sock.sendall((
+            "POST /analyze HTTP/1.1\r\n"
+            f"Host: {host}\r\n"
+            f"Content-Type: multipart/form-data; boundary={boundary}\r\n"
+            f"Content-Length: {body_size}\r\n"
+            "\r\n"
+            f"--{boundary}\r\n"
+            'Content-Disposition: form-data; name="file"; filename="slow_client.pdf"\r\n'
+            "Content-Type: application/pdf\r\n\r\n"
+        ).encode())
+        stats['connected'] += 1
+        sent = 0
+        while not stop_event.is_set() and sent < body_size:
+            sock.sendall(b'x' * 16)
+            sent += 16
+            time.sleep(chunk_delay)
+        sock.close()
+    except OSError as e:
+        stats['errors'] += 1
+        print(f"Slow client error: {str(e)}")
+
+def timed_analysis(url, resume_path, timeout):
+    """Upload a resume normally and return (seconds, status code)"""
+    start_time = time.time()
+    try:
+        with open(resume_path, 'rb') as f:
+            response = requests.post(f"{url.rstrip('/')}/analyze", files={'file': f}, timeout=timeout)
+        return time.time() - start_time, response.status_code
+    except requests.exceptions.RequestException:
+        return time.time() - start_time, None
+
+def run(url, resume_path, slow_clients, fast_requests, chunk_delay, timeout):
+    parsed = urlparse(url)
+    host, port = parsed.hostname, parsed.port or 80
+
+    print(f"\n{'='*50}")
+    print(f"Slow-upload load test against {url}")
+    print(f"{slow_clients} slow clients, {fast_requests} normal analyses")
+    print(f"{'='*50}\n")
+
+    stop_event = threading.Event()
+    stats = {'connected': 0, 'errors': 0}
+    threads = [
+        threading.Thread(target=slow_upload, args=(host, port, stop_event, chunk_delay, stats), daemon=True)
+        for _ in range(slow_clients)
+    ]
+    for thread in threads:
+        thread.start()
+    # Give the slow clients time to occupy whatever they are going to occupy
+    time.sleep(2)
+    print(f"Slow clients connected: {stats['connected']} (errors: {stats['errors']})")
+
+    latencies = []
+    failures = 0
+    for i in range(fast_requests):
+        seconds, status = timed_analysis(url, resume_path, timeout)
+        ok = status == 200
+        print(f"Request {i + 1}: {'✅' if ok else '❌'} status={status} time={seconds:.2f}s")
+        if ok:
+            latencies.append(seconds)
+        else:
+            failures += 1
+
+    stop_event.set()
+
+    print(f"\n{'='*50}")
+    print(f"Successful analyses: {len(latencies)}/{fast_requests}")
+    if latencies:
+        latencies.sort()
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"Latency p50: {statistics.median(latencies):.2f}s")
+        print(f"Latency p95: {p95:.2f}s")
+        print(f"Latency max: {latencies[-1]:.2f}s")
+    print(f"Failed or timed out: {failures}")
+    print(f"{'='*50}\n")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure analysis latency while slow clients hold uploads open. "
+                    "Run once against 'gunicorn app:app' and once against "
+                    "'gunicorn asgi:app -k uvicorn.workers.UvicornWorker' to compare."
+    )
+    parser.add_argument('resume', help="PDF to upload for the normal analyses")
+    parser.add_argument('--url', default='http://localhost:8000')
+    parser.add_argument('--slow-clients', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=10)
+    parser.add_argument('--chunk-delay', type=float, default=1.0, help="Seconds between slow-client chunks")
+    parser.add_argument('--timeout', type=float, default=60)
+    args = parser.parse_args()
+    run(args.url, args.resume, args.slow_clients, args.requests, args.chunk_delay, args.timeout)
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 # This file makes the models directory a Python package
 from .resume_analyzer import ResumeAnalyzer
+from .results import AnalysisResult, AtsResult, ComponentScore, Feedback
 
-__all__ = ['ResumeAnalyzer'] 
\ No newline at end of file
+__all__ = ['ResumeAnalyzer', 'AnalysisResult', 'AtsResult', 'ComponentScore', 'Feedback'] 
\ No newline at end of file
@@ -0,0 +1,416 @@
+"""Columnar, memory-mapped resume corpora.
+
+A corpus is a directory holding one resume column and one category column:
+
+* ``resume.blob``     every resume as UTF-8, back to back
+* ``resume.offsets``  uint64 start offsets into the blob (rows + 1 entries)
+* ``category.codes``  uint16 index into the category dictionary per row
+* ``meta.json``       row count, byte order and the category dictionary
+
+The files are memory-mapped, so opening a corpus costs the same regardless
+of its size and a resume is only decoded to a Python string when it is
+read. Convert the bundled CSV with::
+
+    python -m models.corpus convert UpdatedResumeDataSet.csv UpdatedResumeDataSet.corpus
+
+compare loading it against the CSV with::
+
+    python -m models.corpus bench UpdatedResumeDataSet.csv UpdatedResumeDataSet.corpus
+
+batch-score it into a binary export (see models/serialization.py) with::
+
+    python -m models.corpus score UpdatedResumeDataSet.corpus results.bin [--mode quick]
+
+report how often the quick and full analysis tiers agree with::
+
+    python -m models.corpus agreement UpdatedResumeDataSet.corpus
+
+fit the category classifier once, so workers load it instead of refitting on boot, with::
+
+    python -m models.corpus train-model
+
+and check that memoized, per-section scoring matches uncached scoring with::
+
+    python -m models.corpus equivalence UpdatedResumeDataSet.corpus
+"""
+import argparse
+import csv
+import json
+import mmap
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from array import array
+
+FORMAT_VERSION = 1
+META_FILE = 'meta.json'
+BLOB_FILE = 'resume.blob'
+OFFSETS_FILE = 'resume.offsets'
+CODES_FILE = 'category.codes'
+
+TEXT_COLUMN = 'Resume'
+CATEGORY_COLUMN = 'Category'
+
+
+def convert_csv(csv_path, output_dir, text_column=TEXT_COLUMN, category_column=CATEGORY_COLUMN):
+    """Stream a resume CSV into the columnar format and return the row count.
+
+    The corpus is written to a temporary directory next to output_dir and
+    renamed into place, so a conversion that fails part-way leaves any
+    existing corpus untouched.
+    """
+    output_dir = os.path.normpath(output_dir)
+    parent = os.path.dirname(output_dir) or '.'
+    os.makedirs(parent, exist_ok=True)
+    prefix = f".{os.path.basename(output_dir)}."
+    staging = tempfile.mkdtemp(prefix=prefix, suffix='.partial', dir=parent)
+    try:
+        rows = _write_corpus(csv_path, staging, text_column, category_column)
+        if os.path.exists(output_dir):
+            # A directory can't be replaced while it has files in it, so move
+            # the old corpus aside first
+            previous = tempfile.mkdtemp(prefix=prefix, suffix='.old', dir=parent)
+            os.replace(output_dir, previous)
+            os.replace(staging, output_dir)
+            shutil.rmtree(previous, ignore_errors=True)
+        else:
+            os.replace(staging, output_dir)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return rows
+
+
+def _write_corpus(csv_path, output_dir, text_column, category_column):
+    # Resumes are far longer than the csv module's default field limit
+    csv.field_size_limit(sys.maxsize)
+
+    offsets = array('Q', [0])
+    codes = array('H')
+    categories = {}
+    position = 0
+    with open(csv_path, newline='', encoding='utf-8') as f, \
+            open(os.path.join(output_dir, BLOB_FILE), 'wb') as blob:
+        for row in csv.DictReader(f):
+            data = row[text_column].encode('utf-8')
+            blob.write(data)
+            position += len(data)
+            offsets.append(position)
+            code = categories.setdefault(row[category_column], len(categories))
+            if code > 0xffff:
+                raise ValueError("Too many categories for a uint16 column")
+            codes.append(code)
+
+    with open(os.path.join(output_dir, OFFSETS_FILE), 'wb') as f:
+        offsets.tofile(f)
+    with open(os.path.join(output_dir, CODES_FILE), 'wb') as f:
+        codes.tofile(f)
+    meta = {
+        'version': FORMAT_VERSION,
+        'rows': len(codes),
+        'byteorder': sys.byteorder,
+        'text_column': text_column,
+        'category_column': category_column,
+        'categories': list(categories)
+    }
+    with open(os.path.join(output_dir, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    return len(codes)
+
+
+def _map_file(path):
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class ColumnarCorpus:
+    """Read-only view of a corpus directory written by convert_csv()"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, META_FILE), encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta['version'] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported corpus version: {meta['version']}")
+        if meta['byteorder'] != sys.byteorder:
+            raise ValueError(f"Corpus was written on a {meta['byteorder']}-endian machine")
+        self.categories = meta['categories']
+        self._rows = meta['rows']
+
+        self._maps = [_map_file(os.path.join(path, name)) for name in (BLOB_FILE, OFFSETS_FILE, CODES_FILE)]
+        blob, offsets, codes = self._maps
+        self._blob = memoryview(blob) if blob is not None else memoryview(b'')
+        self.offsets = memoryview(offsets).cast('Q')
+        self.codes = memoryview(codes).cast('H') if codes is not None else memoryview(array('H'))
+
+    def __len__(self):
+        return self._rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def close(self):
+        # Views have to be released before the maps can be closed
+        self._blob.release()
+        self.offsets.release()
+        self.codes.release()
+        for m in self._maps:
+            if m is not None:
+                m.close()
+
+    def resume_bytes(self, index):
+        """Return the UTF-8 bytes of one resume without copying them"""
+        return self._blob[self.offsets[index]:self.offsets[index + 1]]
+
+    def resume(self, index):
+        return str(self.resume_bytes(index), 'utf-8')
+
+    def category(self, index):
+        return self.categories[self.codes[index]]
+
+    def iter_resumes(self, start=0, stop=None):
+        """Decode resumes one at a time, for streaming into a vectorizer or the analyzer"""
+        stop = self._rows if stop is None else min(stop, self._rows)
+        for index in range(start, stop):
+            yield self.resume(index)
+
+    def category_labels(self):
+        """Return the category of every row as a numpy array"""
+        import numpy as np
+        codes = np.frombuffer(self.codes, dtype=np.uint16)
+        return np.asarray(self.categories, dtype=object)[codes]
+
+
+def _load_for_bench(kind, path):
+    """Load a corpus, touch every resume and return (seconds, characters)"""
+    start = time.perf_counter()
+    characters = 0
+    if kind == 'csv':
+        try:
+            import pandas as pd
+        except ImportError:
+            csv.field_size_limit(sys.maxsize)
+            with open(path, newline='', encoding='utf-8') as f:
+                resumes = [row[TEXT_COLUMN] for row in csv.DictReader(f)]
+        else:
+            resumes = pd.read_csv(path)[TEXT_COLUMN]
+        characters = sum(len(text) for text in resumes)
+    else:
+        with ColumnarCorpus(path) as corpus:
+            characters = sum(len(text) for text in corpus.iter_resumes())
+    return time.perf_counter() - start, characters
+
+
+def _peak_rss_kb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def bench(csv_path, corpus_path):
+    """Compare load time and peak memory of CSV vs the columnar format.
+
+    Each format is loaded in a fresh interpreter so peak RSS is not shared.
+    """
+    results = {}
+    for kind, path in (('csv', csv_path), ('columnar', corpus_path)):
+        output = subprocess.run(
+            [sys.executable, '-m', 'models.corpus', 'bench-load', kind, path],
+            check=True, capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        ).stdout
+        results[kind] = json.loads(output)
+    return results
+
+
+# Corpus rows have no file name, so they are scored under a neutral one
+CORPUS_FILENAME = 'resume_text.pdf'
+
+
+def score_corpus(corpus_path, output, limit=None, mode='full', promote_top=None):
+    """Stream a corpus through the analyzer and write packed results.
+
+    With promote_top, every resume is quick-scanned and the best
+    promote_top are re-scored in full before writing.
+    """
+    from .resume_analyzer import ResumeAnalyzer
+    from .serialization import write_records
+
+    analyzer = ResumeAnalyzer(lazy=True)
+    if mode == 'full' or promote_top:
+        analyzer.load_nlp()
+    analyzer.load_and_train_model()
+    start = time.perf_counter()
+    with ColumnarCorpus(corpus_path) as corpus, open(output, 'wb') as f:
+        items = ((text, CORPUS_FILENAME) for text in corpus.iter_resumes(stop=limit))
+        if promote_top:
+            # Only the promoted rows are decoded a second time
+            results = analyzer.triage(items, shortlist_size=promote_top,
+                                      fetch=lambda index: (corpus.resume(index), CORPUS_FILENAME))
+        else:
+            results = analyzer.analyze_texts(items, mode)
+        count = write_records(results, f)
+    elapsed = time.perf_counter() - start
+    print(f"Scored {count} resumes in {elapsed:.2f}s ({1000 * elapsed / max(count, 1):.1f} ms each), "
+          f"results written to {output}")
+    return count
+
+
+def agreement(corpus_path, limit=None, shortlist_size=50):
+    """Compare quick and full analyses of a corpus and return agreement rates"""
+    from .resume_analyzer import QUICK_MODE, FULL_MODE, ResumeAnalyzer, shortlist
+    from .results import COMPONENTS, overall_assessment
+
+    analyzer = ResumeAnalyzer()
+    quick, full = [], []
+    timings = {QUICK_MODE: 0.0, FULL_MODE: 0.0}
+    with ColumnarCorpus(corpus_path) as corpus:
+        for text in corpus.iter_resumes(stop=limit):
+            for mode, results in ((QUICK_MODE, quick), (FULL_MODE, full)):
+                start = time.perf_counter()
+                results.append(analyzer.analyze_text(text, CORPUS_FILENAME, mode))
+                timings[mode] += time.perf_counter() - start
+
+    count = len(full)
+    if not count:
+        return {'resumes': 0}
+    pairs = list(zip(quick, full))
+    shortlist_size = min(shortlist_size, count)
+    quick_shortlist = set(shortlist(quick, shortlist_size))
+    full_shortlist = set(shortlist(full, shortlist_size))
+    return {
+        'resumes': count,
+        'total_score_exact': sum(q.ats.total_score == f.ats.total_score for q, f in pairs) / count,
+        'total_score_within_2': sum(abs(q.ats.total_score - f.ats.total_score) <= 2 for q, f in pairs) / count,
+        'mean_absolute_difference': sum(abs(q.ats.total_score - f.ats.total_score) for q, f in pairs) / count,
+        'assessment_band': sum(
+            overall_assessment(q.ats.total_score) == overall_assessment(f.ats.total_score) for q, f in pairs
+        ) / count,
+        'components': {
+            name: sum(q.ats.scores[name] == f.ats.scores[name] for q, f in pairs) / count
+            for name in COMPONENTS
+        },
+        'shortlist_size': shortlist_size,
+        'shortlist_overlap': len(quick_shortlist & full_shortlist) / shortlist_size,
+        'ms_per_resume': {mode: 1000 * seconds / count for mode, seconds in timings.items()}
+    }
+
+
+def equivalence(corpus_path, limit=None, nlp=None):
+    """Check that memoized, sectioned scoring matches scoring each resume from scratch.
+
+    Every resume is scored through a cached analyzer as it comes (sections
+    shared with earlier resumes are already cached), again with all of its
+    sections cached, and once more after editing its last line, as a
+    re-upload would. Each result is compared with an analyzer that has no
+    cache. Returns the indices of any resumes that differ.
+    """
+    from .resume_analyzer import ResumeAnalyzer
+
+    cached = ResumeAnalyzer(lazy=True, nlp=nlp)
+    cold = ResumeAnalyzer(lazy=True, cache_size=0, nlp=cached.nlp)
+    fields = ('skill_tokens', 'skills', 'action_verbs', 'achievements', 'long_sentences')
+    count = 0
+    reused = 0
+    mismatches = []
+    with ColumnarCorpus(corpus_path) as corpus:
+        for index, text in enumerate(corpus.iter_resumes(stop=limit)):
+            for version in (text, text, text + ' Improved load time by 10%.'):
+                reference = cold.section_stats(version)
+                stats = cached.section_stats(version)
+                reused += stats.reused_sections
+                if (any(getattr(stats, name) != getattr(reference, name) for name in fields)
+                        or cached.calculate_ats_score(version, CORPUS_FILENAME, stats)
+                        != cold.calculate_ats_score(version, CORPUS_FILENAME, reference)):
+                    mismatches.append(index)
+                    break
+            count += 1
+    return {'resumes': count, 'reused_sections': reused, 'mismatches': mismatches}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert and benchmark columnar resume corpora")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    convert = commands.add_parser('convert', help="Convert a resume CSV to the columnar format")
+    convert.add_argument('csv_path')
+    convert.add_argument('output_dir')
+
+    compare = commands.add_parser('bench', help="Compare load time and peak memory against CSV")
+    compare.add_argument('csv_path')
+    compare.add_argument('corpus_path')
+
+    score = commands.add_parser('score', help="Batch-score a corpus into packed result records")
+    score.add_argument('corpus_path')
+    score.add_argument('output')
+    score.add_argument('--limit', type=int, help="Only score the first N resumes")
+    score.add_argument('--mode', choices=['full', 'quick'], default='full')
+    score.add_argument('--promote-top', type=int, help="Quick-scan all, then fully score the best N")
+
+    agree = commands.add_parser('agreement', help="Report agreement between the quick and full tiers")
+    agree.add_argument('corpus_path')
+    agree.add_argument('--limit', type=int, help="Only compare the first N resumes")
+    agree.add_argument('--shortlist', type=int, default=50, help="Shortlist size to compare")
+
+    fit = commands.add_parser('train-model', help="Fit the category classifier and save it for startup")
+    fit.add_argument('--output', help="Where to save the fitted model (default: the analyzer's MODEL_PATH)")
+
+    same = commands.add_parser('equivalence', help="Check cached, sectioned scoring against uncached scoring")
+    same.add_argument('corpus_path')
+    same.add_argument('--limit', type=int, help="Only check the first N resumes")
+
+    load = commands.add_parser('bench-load', help=argparse.SUPPRESS)
+    load.add_argument('kind', choices=['csv', 'columnar'])
+    load.add_argument('path')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'convert':
+        start = time.perf_counter()
+        rows = convert_csv(args.csv_path, args.output_dir)
+        print(f"Converted {rows} resumes to {args.output_dir} in {time.perf_counter() - start:.2f}s")
+    elif args.command == 'score':
+        score_corpus(args.corpus_path, args.output, args.limit, args.mode, args.promote_top)
+    elif args.command == 'agreement':
+        report = agreement(args.corpus_path, args.limit, args.shortlist)
+        print(json.dumps(report, indent=2))
+    elif args.command == 'train-model':
+        from .resume_analyzer import MODEL_PATH, ResumeAnalyzer
+
+        output = args.output or MODEL_PATH
+        start = time.perf_counter()
+        ResumeAnalyzer(lazy=True).save_model(output)
+        print(f"Fitted the category classifier in {time.perf_counter() - start:.2f}s, saved to {output}")
+    elif args.command == 'equivalence':
+        report = equivalence(args.corpus_path, args.limit)
+        print(json.dumps(report, indent=2))
+        return 1 if report['mismatches'] else 0
+    elif args.command == 'bench-load':
+        baseline = _peak_rss_kb()
+        seconds, characters = _load_for_bench(args.kind, args.path)
+        print(json.dumps({
+            'seconds': round(seconds, 4),
+            'characters': characters,
+            'peak_rss_kb': _peak_rss_kb(),
+            'peak_rss_growth_kb': _peak_rss_kb() - baseline
+        }))
+    else:
+        results = bench(args.csv_path, args.corpus_path)
+        print(f"{'format':<10} {'load + scan (s)':>16} {'peak RSS (MB)':>14} {'RSS growth (MB)':>16}")
+        for kind, r in results.items():
+            print(f"{kind:<10} {r['seconds']:>16.3f} {r['peak_rss_kb'] / 1024:>14.1f} "
+                  f"{r['peak_rss_growth_kb'] / 1024:>16.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
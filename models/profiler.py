@@ -0,0 +1,315 @@
+"""On-demand sampling profiler for individual resume analyses.
+
+The profiler samples the call stack of the thread running ``analyze_resume``
+and produces two views of the same data:
+
+* folded stacks (``frame;frame;frame count``), the input format of
+  flamegraph.pl, speedscope and inferno
+* a short list of the hottest functions, small enough to inline in the
+  JSON response
+
+It can also be run offline against a file on disk::
+
+    python -m models.profiler path/to/resume.pdf --output resume.folded
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+DEFAULT_INTERVAL = 0.001  # seconds between samples
+DEFAULT_TOP = 15
+# Stored profiles beyond this many, or older than this many seconds, are deleted
+DEFAULT_MAX_PROFILES = 100
+DEFAULT_MAX_AGE = 24 * 60 * 60
+
+# Request IDs are logged and echoed back, so only allow a conservative alphabet
+_REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+# Profile IDs are generated by new_profile_id() and used as file names
+_PROFILE_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+# The switch interval is process-wide, so concurrent profiles share one override
+_switch_lock = threading.Lock()
+_active_profilers = 0
+_saved_switch_interval = None
+
+
+def new_request_id():
+    """Return a fresh request ID"""
+    return uuid.uuid4().hex
+
+
+def is_valid_request_id(request_id):
+    """Check that a client-supplied request ID is safe to log and echo back"""
+    return bool(request_id) and bool(_REQUEST_ID_PATTERN.fullmatch(request_id))
+
+
+def new_profile_id():
+    """Return a fresh, unguessable profile ID"""
+    return uuid.uuid4().hex
+
+
+def is_valid_profile_id(profile_id):
+    """Check that a profile ID has the form new_profile_id() produces"""
+    return bool(profile_id) and bool(_PROFILE_ID_PATTERN.fullmatch(profile_id))
+
+
+class SamplingProfiler:
+    """Sample the call stack of a single thread at a fixed interval"""
+
+    def __init__(self, interval=DEFAULT_INTERVAL, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.stacks = Counter()
+        self.samples = 0
+        self.duration = 0.0
+        self._stop_event = threading.Event()
+        self._sampler = None
+        self._started_at = None
+
+    def start(self):
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._stop_event.clear()
+        self._push_switch_interval()
+        self._started_at = time.perf_counter()
+        self._sampler = threading.Thread(target=self._run, name='scanlytic-profiler', daemon=True)
+        self._sampler.start()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+        if self._started_at is not None:
+            self.duration = time.perf_counter() - self._started_at
+            self._started_at = None
+            self._pop_switch_interval()
+        return self
+
+    def _push_switch_interval(self):
+        # The sampler needs the GIL to take a sample, so ask the interpreter to
+        # hand it over at least as often as we want to sample
+        global _active_profilers, _saved_switch_interval
+        with _switch_lock:
+            if _active_profilers == 0:
+                _saved_switch_interval = sys.getswitchinterval()
+            _active_profilers += 1
+            sys.setswitchinterval(min(sys.getswitchinterval(), self.interval))
+
+    def _pop_switch_interval(self):
+        global _active_profilers
+        with _switch_lock:
+            _active_profilers -= 1
+            if _active_profilers == 0:
+                sys.setswitchinterval(_saved_switch_interval)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def _run(self):
+        own_file = os.path.abspath(__file__)
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                # Skip the profiler's own frames (context manager, profile())
+                if os.path.abspath(code.co_filename) != own_file:
+                    stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            # Don't record the target waiting for us in stop()
+            if stack and not self._stop_event.is_set():
+                stack.reverse()
+                self.stacks[tuple(stack)] += 1
+                self.samples += 1
+
+    @staticmethod
+    def _label(frame):
+        filename, lineno, name = frame
+        return f"{name} ({os.path.basename(filename)}:{lineno})"
+
+    def folded(self):
+        """Render the samples as folded stacks for flamegraph tools"""
+        lines = []
+        for stack, count in self.stacks.most_common():
+            # ';' separates frames and ' ' separates the count in this format
+            frames = [self._label(frame).replace(';', ':') for frame in stack]
+            lines.append(f"{';'.join(frames)} {count}")
+        return '\n'.join(lines) + ('\n' if lines else '')
+
+    def top_functions(self, limit=DEFAULT_TOP):
+        """Return the functions with the most samples, hottest first"""
+        self_counts = Counter()
+        total_counts = Counter()
+        for stack, count in self.stacks.items():
+            self_counts[stack[-1]] += count
+            # A recursive function only counts once per sample
+            for frame in set(stack):
+                total_counts[frame] += count
+
+        total = self.samples or 1
+        ranked = sorted(total_counts, key=lambda f: (self_counts[f], total_counts[f]), reverse=True)
+        top = []
+        for frame in ranked[:limit]:
+            filename, lineno, name = frame
+            top.append({
+                'function': name,
+                'file': filename,
+                'line': lineno,
+                'self_samples': self_counts[frame],
+                'total_samples': total_counts[frame],
+                'self_percent': round(100.0 * self_counts[frame] / total, 1),
+                'total_percent': round(100.0 * total_counts[frame] / total, 1)
+            })
+        return top
+
+    def summary(self, limit=DEFAULT_TOP):
+        """Return a JSON-friendly summary of the profile"""
+        return {
+            'duration_ms': round(self.duration * 1000, 2),
+            'interval_ms': round(self.interval * 1000, 3),
+            'samples': self.samples,
+            'top_functions': self.top_functions(limit)
+        }
+
+
+class ProfileStore:
+    """Keep finished profiles on disk, keyed by a server-generated profile ID.
+
+    Profile IDs never come from the client, so one caller cannot overwrite
+    another's trace. Only the newest max_profiles profiles younger than
+    max_age seconds are kept.
+    """
+
+    def __init__(self, directory, max_profiles=DEFAULT_MAX_PROFILES, max_age=DEFAULT_MAX_AGE):
+        self.directory = directory
+        self.max_profiles = max_profiles
+        self.max_age = max_age
+        self._lock = threading.Lock()
+
+    def _path(self, profile_id, extension):
+        if not is_valid_profile_id(profile_id):
+            raise ValueError(f"Invalid profile ID: {profile_id!r}")
+        return os.path.join(self.directory, f"{profile_id}.{extension}")
+
+    def save(self, profiler, request_id=None, limit=DEFAULT_TOP):
+        """Store a finished profile and return its summary, including the new profile_id"""
+        os.makedirs(self.directory, exist_ok=True)
+        profile_id = new_profile_id()
+        summary = profiler.summary(limit)
+        summary['profile_id'] = profile_id
+        summary['request_id'] = request_id
+        with open(self._path(profile_id, 'folded'), 'w', encoding='utf-8') as f:
+            f.write(profiler.folded())
+        with open(self._path(profile_id, 'json'), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        self.prune()
+        return summary
+
+    def prune(self, now=None):
+        """Delete profiles beyond max_profiles or older than max_age; return how many"""
+        now = time.time() if now is None else now
+        with self._lock:
+            try:
+                names = os.listdir(self.directory)
+            except FileNotFoundError:
+                return 0
+            profiles = []
+            for name in names:
+                profile_id, extension = os.path.splitext(name)
+                if extension == '.json' and is_valid_profile_id(profile_id):
+                    try:
+                        profiles.append((os.path.getmtime(os.path.join(self.directory, name)), profile_id))
+                    except FileNotFoundError:
+                        continue
+            profiles.sort(reverse=True)
+            expired = [
+                profile_id for rank, (mtime, profile_id) in enumerate(profiles)
+                if rank >= self.max_profiles or now - mtime > self.max_age
+            ]
+            for profile_id in expired:
+                for extension in ('folded', 'json'):
+                    try:
+                        os.remove(self._path(profile_id, extension))
+                    except FileNotFoundError:
+                        pass
+            return len(expired)
+
+    def folded_path(self, profile_id):
+        """Return the path of a stored folded-stack file, or None"""
+        try:
+            path = self._path(profile_id, 'folded')
+        except ValueError:
+            return None
+        return path if os.path.exists(path) else None
+
+    def load_summary(self, profile_id):
+        """Return the stored summary of a profile, or None"""
+        try:
+            path = self._path(profile_id, 'json')
+        except ValueError:
+            return None
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+
+def profile(func, *args, interval=DEFAULT_INTERVAL, **kwargs):
+    """Run ``func`` under the sampling profiler and return (result, profiler)"""
+    profiler = SamplingProfiler(interval=interval)
+    with profiler:
+        result = func(*args, **kwargs)
+    return result, profiler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile the analysis of a single resume file")
+    parser.add_argument('resume', help="Path to the resume PDF")
+    parser.add_argument('--output', '-o', help="Write folded stacks to this file (default: <resume>.folded)")
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL, help="Sampling interval in seconds")
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP, help="Number of functions to print")
+    parser.add_argument('--repeat', type=int, default=1, help="Analyze the file this many times")
+    args = parser.parse_args(argv)
+
+    from .resume_analyzer import ResumeAnalyzer
+
+    # Build the analyzer outside the profile so only the request path is measured
+    analyzer = ResumeAnalyzer()
+
+    def run():
+        for _ in range(args.repeat):
+            analyzer.analyze_resume(args.resume)
+
+    _, profiler = profile(run, interval=args.interval)
+
+    output = args.output or f"{os.path.splitext(args.resume)[0]}.folded"
+    with open(output, 'w', encoding='utf-8') as f:
+        f.write(profiler.folded())
+
+    summary = profiler.summary(args.top)
+    print(f"Analyzed {args.resume} {args.repeat}x in {summary['duration_ms']} ms "
+          f"({summary['samples']} samples)")
+    print(f"{'self %':>7} {'total %':>8}  function")
+    for entry in summary['top_functions']:
+        location = f"{os.path.basename(entry['file'])}:{entry['line']}"
+        print(f"{entry['self_percent']:>7} {entry['total_percent']:>8}  {entry['function']} ({location})")
+    print(f"Folded stacks written to {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""Typed, compact analysis results.
+
+Scores are kept as small slotted dataclasses and feedback as integer enum
+codes. Human-readable text (feedback messages, assessment, strengths and
+improvement tips) is only produced when a result is rendered with
+``to_dict()`` for the web UI or the PDF report.
+"""
+from dataclasses import dataclass, field
+from enum import IntEnum
+
+# Score components in the order they are computed and reported
+COMPONENTS = (
+    'keyword_match',
+    'section_presence',
+    'experience_relevance',
+    'formatting',
+    'grammar',
+    'contact_info',
+    'filename',
+    'customization'
+)
+
+
+class Feedback(IntEnum):
+    FEW_SKILLS = 1
+    MISSING_SUMMARY = 2
+    MISSING_SKILLS = 3
+    MISSING_EXPERIENCE = 4
+    MISSING_EDUCATION = 5
+    MISSING_PROJECTS = 6
+    MISSING_CERTIFICATIONS = 7
+    FEW_ACTION_VERBS = 8
+    FEW_ACHIEVEMENTS = 9
+    USES_TABLES = 10
+    COMPLEX_LAYOUT = 11
+    LONG_SENTENCES = 12
+    INCOMPLETE_CONTACT = 13
+    FILENAME_NO_NAME = 14
+    FILENAME_GENERIC = 15
+    TOO_BRIEF = 16
+    MISSING_KEY_SECTIONS = 17
+    FEW_METRICS = 18
+
+    @property
+    def text(self):
+        return FEEDBACK_TEXT[self]
+
+
+FEEDBACK_TEXT = {
+    Feedback.FEW_SKILLS: "Add more technical skills to your resume",
+    Feedback.MISSING_SUMMARY: "Missing summary section",
+    Feedback.MISSING_SKILLS: "Missing skills section",
+    Feedback.MISSING_EXPERIENCE: "Missing experience section",
+    Feedback.MISSING_EDUCATION: "Missing education section",
+    Feedback.MISSING_PROJECTS: "Missing projects section",
+    Feedback.MISSING_CERTIFICATIONS: "Missing certifications section",
+    Feedback.FEW_ACTION_VERBS: "Add more action verbs to describe your experience",
+    Feedback.FEW_ACHIEVEMENTS: "Include more quantified achievements",
+    Feedback.USES_TABLES: "Avoid using tables in your resume",
+    Feedback.COMPLEX_LAYOUT: "Simplify your resume layout",
+    Feedback.LONG_SENTENCES: "Some sentences are too long",
+    Feedback.INCOMPLETE_CONTACT: "Add more contact information",
+    Feedback.FILENAME_NO_NAME: "Include your name in the filename",
+    Feedback.FILENAME_GENERIC: "Use a more specific filename (e.g., YourName_Resume.pdf)",
+    Feedback.TOO_BRIEF: "Resume might be too brief; consider adding more detail and examples.",
+    Feedback.MISSING_KEY_SECTIONS: "Ensure your resume includes key sections like Summary, Experience, Skills, and Education.",
+    Feedback.FEW_METRICS: "Quantify your achievements with numbers, percentages, or metrics whenever possible."
+}
+
+# Feedback code for each entry of ResumeAnalyzer.section_headers
+MISSING_SECTION = {
+    'summary': Feedback.MISSING_SUMMARY,
+    'skills': Feedback.MISSING_SKILLS,
+    'experience': Feedback.MISSING_EXPERIENCE,
+    'education': Feedback.MISSING_EDUCATION,
+    'projects': Feedback.MISSING_PROJECTS,
+    'certifications': Feedback.MISSING_CERTIFICATIONS
+}
+
+# Improvement tips, in the order they are shown
+IMPROVEMENT_TIPS = {
+    Feedback.FEW_SKILLS: "Strengthen your resume by integrating more industry-specific technical keywords relevant to your target roles.",
+    Feedback.MISSING_SUMMARY: "Include a concise professional summary or objective statement at the top of your resume.",
+    Feedback.MISSING_SKILLS: "Add a dedicated skills section to highlight your technical and soft skills clearly.",
+    Feedback.MISSING_EXPERIENCE: "Ensure you have a detailed 'Experience' or 'Work History' section.",
+    Feedback.MISSING_EDUCATION: "Include an 'Education' section with your degrees, institutions, and dates.",
+    Feedback.FEW_ACTION_VERBS: "Use strong action verbs (e.g., 'Developed', 'Managed', 'Achieved') to describe your accomplishments.",
+    Feedback.FEW_ACHIEVEMENTS: "Quantify your accomplishments with numbers, percentages, or metrics whenever possible.",
+    Feedback.USES_TABLES: "Remove tables and complex formatting elements that can be difficult for ATS to parse.",
+    Feedback.COMPLEX_LAYOUT: "Opt for a clean, simple, and standard resume layout for optimal ATS compatibility.",
+    Feedback.LONG_SENTENCES: "Break down long sentences for better readability and clarity.",
+    Feedback.INCOMPLETE_CONTACT: "Ensure your resume includes essential contact details: email, phone number, and a LinkedIn profile URL.",
+    Feedback.FILENAME_NO_NAME: "Rename your resume file to include your full name (e.g., 'JohnDoe_Resume.pdf').",
+    Feedback.FILENAME_GENERIC: "Avoid generic filenames like 'resume.pdf'; use a more descriptive name."
+}
+
+# (component, predicate on its score, strength text), in the order they are shown
+STRENGTHS = (
+    ('keyword_match', lambda s: s >= 20, "Strong keyword optimization, indicating a good match for target roles."),
+    ('section_presence', lambda s: s >= 8, "All essential resume sections are present, ensuring comprehensive information."),
+    ('experience_relevance', lambda s: s >= 10, "Well-articulated experience with quantifiable achievements and strong action verbs."),
+    ('formatting', lambda s: s >= 8, "Clean and ATS-friendly formatting, enhancing readability."),
+    ('grammar', lambda s: s >= 8, "Excellent grammar and clear, concise language."),
+    ('contact_info', lambda s: s >= 4, "Complete and easily identifiable contact information."),
+    ('filename', lambda s: s == 5, "Professional and appropriate filename."),
+    ('customization', lambda s: s >= 7, "Resume appears well-customized and detailed.")
+)
+NO_STRENGTHS = "No specific strengths identified yet. Focus on all areas for improvement."
+
+JOB_RECOMMENDATIONS = (
+    {"title": "Software Engineer", "company": "Tech Solutions Inc.", "location": "San Francisco, CA", "match_score": 90, "link": "#"},
+    {"title": "Data Scientist", "company": "Quant Insights LLC", "location": "New York, NY", "match_score": 85, "link": "#"},
+    {"title": "Product Manager", "company": "Innovate Corp.", "location": "Seattle, WA", "match_score": 75, "link": "#"},
+    {"title": "UX Designer", "company": "Creative Studio", "location": "Austin, TX", "match_score": 70, "link": "#"},
+)
+
+
+@dataclass(slots=True)
+class ComponentScore:
+    name: str
+    score: int
+    feedback: tuple = ()
+
+    def feedback_text(self):
+        return [code.text for code in self.feedback]
+
+
+@dataclass(slots=True)
+class AtsResult:
+    components: tuple  # ComponentScore for each entry of COMPONENTS
+    total_score: int = field(init=False)
+
+    def __post_init__(self):
+        self.total_score = sum(c.score for c in self.components)
+
+    @property
+    def scores(self):
+        return {c.name: c.score for c in self.components}
+
+    @property
+    def feedback_codes(self):
+        return {code for c in self.components for code in c.feedback}
+
+    def feedback_text(self):
+        return {c.name: c.feedback_text() for c in self.components}
+
+    def to_dict(self):
+        return {
+            'total_score': self.total_score,
+            'scores': self.scores,
+            'feedback': self.feedback_text()
+        }
+
+
+@dataclass(slots=True)
+class AnalysisResult:
+    ats: AtsResult
+    predicted_category: str
+    technical_skills: tuple
+    soft_skills: tuple
+    missing_skills: tuple
+    job_recommendations: tuple = JOB_RECOMMENDATIONS
+    mode: str = 'full'
+
+    @property
+    def approximate(self):
+        """True for quick-scan results, which approximate the spaCy checks"""
+        return self.mode != 'full'
+
+    def to_dict(self):
+        """Render the result in the JSON schema served to the web UI"""
+        result = {
+            'ats_score': self.ats.total_score,
+            'score_breakdown': self.ats.scores,
+            'analysis': {
+                'overall_assessment': overall_assessment(self.ats.total_score),
+                'strengths': strengths(self.ats),
+                'improvements': improvement_tips(self.ats)
+            },
+            'job_recommendations': list(self.job_recommendations),
+            'skills_analysis': {
+                'technical': list(self.technical_skills),
+                'soft': list(self.soft_skills),
+                'missing': list(self.missing_skills)
+            }
+        }
+        if self.approximate:
+            result['mode'] = self.mode
+            result['approximate'] = True
+        return result
+
+
+def overall_assessment(score):
+    if score >= 80:
+        return "Excellent! Your resume is highly optimized for ATS and presents a strong candidate profile."
+    elif score >= 60:
+        return "Good job! Your resume is generally well-optimized, but there's room for improvement in specific areas."
+    elif score >= 40:
+        return "Your resume has potential but needs significant optimization to pass ATS and attract recruiters."
+    else:
+        return "Your resume needs substantial work to meet modern ATS and recruiter expectations."
+
+
+def strengths(ats):
+    scores = ats.scores
+    found = [text for name, predicate, text in STRENGTHS if predicate(scores[name])]
+    return found or [NO_STRENGTHS]
+
+
+def improvement_tips(ats):
+    codes = ats.feedback_codes
+    return [tip for code, tip in IMPROVEMENT_TIPS.items() if code in codes]
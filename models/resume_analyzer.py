@@ -1,24 +1,107 @@
-import fitz  # PyMuPDF
-import pandas as pd
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
-from sklearn.model_selection import train_test_split
-import spacy
 import re
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
 import io
 import os
-from collections import defaultdict
+import hashlib
+import threading
+import logging
+from collections.abc import Sequence
 from datetime import datetime
 
+from .results import (
+    JOB_RECOMMENDATIONS, MISSING_SECTION, AnalysisResult, AtsResult, ComponentScore, Feedback,
+    improvement_tips, overall_assessment, strengths
+)
+from .sections import DEFAULT_CACHE_SIZE, LRUCache, SectionStats, TextStats, section_key, split_sections
+
+# The heavy dependencies (spaCy, pandas, scikit-learn, PyMuPDF, reportlab) are
+# imported where they are first used so that importing this module, and hence
+# booting the web app, stays cheap. See ResumeAnalyzer(lazy=True).
+
+logger = logging.getLogger(__name__)
+
+SPACY_MODEL = 'en_core_web_sm'
+DATASET_PATH = 'UpdatedResumeDataSet.csv'
+# Columnar copy of the dataset (see models/corpus.py), used when present
+CORPUS_PATH = 'UpdatedResumeDataSet.corpus'
+# Category classifier fitted at build time, loaded instead of refitting on boot
+MODEL_PATH = 'category_model.joblib'
+
+ACHIEVEMENT_PATTERN = re.compile(r'\d+%|\$\d+|\d+x|\d+ times')
+
+# Analysis tiers: 'full' uses spaCy, 'quick' approximates it with regular
+# expressions for first-pass triage
+FULL_MODE = 'full'
+QUICK_MODE = 'quick'
+MODES = (FULL_MODE, QUICK_MODE)
+
+# Quick mode approximations of the spaCy tokenizer and sentence splitter
+QUICK_TOKEN_PATTERN = re.compile(r'[^\s/]+')
+QUICK_HYPHEN_INFIX = re.compile(r'(?<=[a-z0-9])-(?=[a-z])')
+QUICK_PUNCTUATION = '.,;:!?()[]{}"\'`*•'
+QUICK_SENTENCE_PATTERN = re.compile(r'(?<=[.!?])\s+|\n\s*\n')
+QUICK_WORD_PATTERN = re.compile(r'\w+|[^\w\s]')
+
+# Pipeline components needed for tokens and sentence boundaries; the rest
+# are skipped when parsing sections
+SENTENCE_PIPES = ('tok2vec', 'parser', 'senter', 'sentencizer')
+
+# A small synthetic resume used to warm up every stage of the pipeline
+WARMUP_RESUME = """John Doe
+john.doe@example.com | 555-123-4567 | linkedin.com/in/johndoe
+
+Summary
+Software engineer who developed and optimized data services.
+
+Skills
+Python, SQL, Docker, AWS, leadership, communication
+
+Experience
+Developed a Flask API that improved response times by 40% and increased revenue by $20000.
+Led a team of 5 engineers and delivered 3x faster releases.
+
+Education
+B.Sc. Computer Science
+"""
+
+
+def load_spacy_model(name=SPACY_MODEL):
+    """Load a spaCy model, downloading it first if it is missing"""
+    import spacy
+    try:
+        return spacy.load(name)
+    except OSError:
+        logger.warning(f"SpaCy model {name} not found. Downloading...")
+        spacy.cli.download(name)
+        return spacy.load(name)
+
+
+def shortlist(results, size=None, min_score=None):
+    """Return the indices of the best results, highest ATS score first"""
+    ranked = sorted(range(len(results)), key=lambda i: results[i].ats.total_score, reverse=True)
+    if min_score is not None:
+        ranked = [i for i in ranked if results[i].ats.total_score >= min_score]
+    return ranked if size is None else ranked[:size]
+
+
 class ResumeAnalyzer:
-    def __init__(self):
-        self.nlp = spacy.load("en_core_web_sm")
-        self.vectorizer = TfidfVectorizer(max_features=5000)
-        self.classifier = LogisticRegression(max_iter=1000)
-        self.load_and_train_model()
+    def __init__(self, lazy=False, cache_size=DEFAULT_CACHE_SIZE, nlp=None):
+        # With lazy=True the spaCy model is loaded and the classifier trained on
+        # first use (or by warm_up()) instead of in the constructor. nlp is an
+        # already loaded pipeline to use instead of SPACY_MODEL.
+        self._nlp = nlp
+        self._model_ready = False
+        # Separate locks, so a quick-mode request that only needs the
+        # classifier doesn't wait for spaCy to load, and vice versa
+        self._nlp_lock = threading.Lock()
+        self._model_lock = threading.Lock()
+
+        # Per-section NLP results keyed by section hash, and extracted text
+        # keyed by file hash, so re-uploads only reprocess what changed
+        self.section_cache = LRUCache(cache_size)
+        self.text_cache = LRUCache(max(cache_size // 64, 1) if cache_size else 0)
+        if not lazy:
+            self.load_nlp()
+            self.load_and_train_model()
         
         # Common section headers
         self.section_headers = {
@@ -39,6 +122,8 @@ class ResumeAnalyzer:
             'data_science': ['pandas', 'numpy', 'scikit-learn', 'tensorflow', 'pytorch', 'spark', 'hadoop'],
             'soft_skills': ['leadership', 'communication', 'teamwork', 'problem-solving', 'time management', 'adaptability']
         }
+        self._all_skills = frozenset(skill for skills in self.skills_dict.values() for skill in skills)
+        self._header_keywords = frozenset(keyword for keywords in self.section_headers.values() for keyword in keywords)
 
         # Action verbs for experience relevance
         self.action_verbs = [
@@ -47,10 +132,112 @@ class ResumeAnalyzer:
             'analyzed', 'resolved', 'delivered', 'maintained', 'enhanced', 'streamlined'
         ]
 
+    @property
+    def nlp(self):
+        if self._nlp is None:
+            self.load_nlp()
+        return self._nlp
+
+    def load_nlp(self):
+        with self._nlp_lock:
+            if self._nlp is None:
+                self._nlp = load_spacy_model()
+        return self._nlp
+
+    @property
+    def is_ready(self):
+        """True once the spaCy model is loaded and the classifier is trained"""
+        return self._nlp is not None and self._model_ready
+
     def load_and_train_model(self):
+        with self._model_lock:
+            if self._model_ready:
+                return
+            self._train_model()
+            self._model_ready = True
+
+    def _train_model(self):
+        if not self._load_fitted_model():
+            self._fit_model()
+
+    def _load_fitted_model(self, path=MODEL_PATH):
+        """Load the vectorizer and classifier saved by save_model(); False if they can't be used"""
+        if not os.path.exists(path):
+            return False
+        sources = (DATASET_PATH, os.path.join(CORPUS_PATH, 'meta.json'))
+        if any(os.path.exists(source) and os.path.getmtime(source) > os.path.getmtime(path) for source in sources):
+            logger.warning(f"{path} is older than the training data; refitting. "
+                           f"Re-run 'python -m models.corpus train-model' to update it.")
+            return False
+
+        import joblib
+        import sklearn
+        try:
+            fitted = joblib.load(path)
+        except Exception as e:
+            logger.warning(f"Could not load {path}, refitting: {str(e)}")
+            return False
+        if fitted.get('sklearn_version') != sklearn.__version__:
+            logger.warning(f"{path} was fitted with scikit-learn {fitted.get('sklearn_version')}, "
+                           f"not {sklearn.__version__}; refitting.")
+            return False
+        self.vectorizer = fitted['vectorizer']
+        self.classifier = fitted['classifier']
+        return True
+
+    def save_model(self, path=MODEL_PATH):
+        """Fit the category classifier on the training data and save it for later boots"""
+        import joblib
+        import sklearn
+
+        self._fit_model()
+        partial = f"{path}.partial"
+        joblib.dump({
+            'sklearn_version': sklearn.__version__,
+            'vectorizer': self.vectorizer,
+            'classifier': self.classifier
+        }, partial)
+        os.replace(partial, path)
+
+    def _fit_model(self):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.model_selection import train_test_split
+
+        self.vectorizer = TfidfVectorizer(max_features=5000)
+        self.classifier = LogisticRegression(max_iter=1000)
+
+        if self._corpus_is_current():
+            from .corpus import ColumnarCorpus
+
+            # Stream resumes straight from the memory-mapped corpus
+            with ColumnarCorpus(CORPUS_PATH) as corpus:
+                X = self.vectorizer.fit_transform(corpus.iter_resumes())
+                y = corpus.category_labels()
+        else:
+            X, y = self._vectorize_csv()
+        
+        # Split and train
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        self.classifier.fit(X_train, y_train)
+
+    def _corpus_is_current(self):
+        """True if the columnar corpus exists and is at least as new as the CSV"""
+        meta_path = os.path.join(CORPUS_PATH, 'meta.json')
+        if not os.path.exists(meta_path):
+            return False
+        if os.path.exists(DATASET_PATH) and os.path.getmtime(DATASET_PATH) > os.path.getmtime(meta_path):
+            logger.warning(f"{DATASET_PATH} is newer than {CORPUS_PATH}; training from the CSV. "
+                           f"Re-run 'python -m models.corpus convert' to update the corpus.")
+            return False
+        return True
+
+    def _vectorize_csv(self):
+        import pandas as pd
+
         # Load the dataset
         try:
-            df = pd.read_csv('UpdatedResumeDataSet.csv')
+            df = pd.read_csv(DATASET_PATH)
         except FileNotFoundError:
             print("Error: UpdatedResumeDataSet.csv not found. Please ensure the dataset is in the correct directory.")
             # Create a dummy dataframe to prevent further errors
@@ -59,91 +246,132 @@ class ResumeAnalyzer:
         # Prepare the data
         X = self.vectorizer.fit_transform(df['Resume'])
         y = df['Category']
-        
-        # Split and train
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-        self.classifier.fit(X_train, y_train)
+        return X, y
 
-    def extract_text_from_pdf(self, pdf_path):
-        doc = fitz.open(pdf_path)
+    def warm_up(self):
+        """Load everything and run one synthetic analysis so the first real request is fast"""
+        self.load_nlp()
+        self.load_and_train_model()
+        self.analyze_text(WARMUP_RESUME, 'John_Doe_Resume.pdf')
+
+    def extract_text_from_pdf(self, pdf_path, content_hash=None):
+        import fitz  # PyMuPDF
+        with open(pdf_path, 'rb') as f:
+            data = f.read()
+        key = content_hash or hashlib.blake2b(data, digest_size=16).hexdigest()
+        text = self.text_cache.get(key)
+        if text is not None:
+            return text
+        
+        doc = fitz.open(stream=data, filetype='pdf')
         text = ""
         for page in doc:
             text += page.get_text()
+        self.text_cache.put(key, text)
         return text
 
-    def calculate_ats_score(self, text, filename):
-        scores = defaultdict(int)
-        feedback = defaultdict(list)
-        
-        # 1. Keyword Match (25 pts)
-        keyword_score = self.analyze_keywords(text)
-        scores['keyword_match'] = keyword_score['score']
-        feedback['keyword_match'] = keyword_score['feedback']
-        
-        # 2. Section Presence (10 pts)
-        section_score = self.analyze_sections(text)
-        scores['section_presence'] = section_score['score']
-        feedback['section_presence'] = section_score['feedback']
-        
-        # 3. Experience Relevance (15 pts)
-        exp_score = self.analyze_experience(text)
-        scores['experience_relevance'] = exp_score['score']
-        feedback['experience_relevance'] = exp_score['feedback']
-        
-        # 4. Formatting & Readability (10 pts)
-        format_score = self.analyze_formatting(text)
-        scores['formatting'] = format_score['score']
-        feedback['formatting'] = format_score['feedback']
-        
-        # 5. Grammar & Clarity (10 pts)
-        grammar_score = self.analyze_grammar(text)
-        scores['grammar'] = grammar_score['score']
-        feedback['grammar'] = grammar_score['feedback']
-        
-        # 6. Contact Information (5 pts)
-        contact_score = self.analyze_contact_info(text)
-        scores['contact_info'] = contact_score['score']
-        feedback['contact_info'] = contact_score['feedback']
-        
-        # 7. File Naming (5 pts)
-        filename_score = self.analyze_filename(filename)
-        scores['filename'] = filename_score['score']
-        feedback['filename'] = filename_score['feedback']
-        
-        # 8. Customization (10 pts)
-        custom_score = self.analyze_customization(text)
-        scores['customization'] = custom_score['score']
-        feedback['customization'] = custom_score['feedback']
-        
-        # Calculate total score
-        total_score = sum(scores.values())
-        
-        return {
-            'total_score': total_score,
-            'scores': dict(scores),
-            'feedback': dict(feedback)
-        }
-
-    def analyze_keywords(self, text):
+    def section_stats(self, text):
+        """Return the merged per-section NLP results for text, reusing cached sections.
+
+        Each section is parsed on its own, so a sentence always ends at a
+        section boundary and a section's results never depend on the rest
+        of the text. A run with every section cached therefore scores
+        exactly like a cold one.
+        """
+        sections = split_sections(text, self._header_keywords)
+        keys = [section_key(section) for section in sections]
+        stats = [self.section_cache.get(key) for key in keys]
+        missing = [i for i, section_stats in enumerate(stats) if section_stats is None]
+        if missing:
+            docs = self.nlp.pipe((sections[i] for i in missing), disable=self._unused_pipes())
+            for i, doc in zip(missing, docs):
+                stats[i] = self._analyze_section(sections[i], doc)
+                self.section_cache.put(keys[i], stats[i])
+        return TextStats.merge(stats, len(sections) - len(missing))
+
+    def _unused_pipes(self):
+        # Only tokens and sentence boundaries are used, so skip the tagger,
+        # lemmatizer and entity recognizer
+        return [name for name in self.nlp.pipe_names if name not in SENTENCE_PIPES]
+
+    def quick_stats(self, text):
+        """Approximate section_stats() with regular expressions instead of spaCy"""
+        sections = [self._quick_section(section) for section in split_sections(text, self._header_keywords)]
+        return TextStats.merge(sections)
+
+    def _quick_section(self, section):
+        section_lower = section.lower()
+        skill_tokens = set()
+        for word in QUICK_TOKEN_PATTERN.findall(section_lower):
+            for token in QUICK_HYPHEN_INFIX.split(word.strip(QUICK_PUNCTUATION)):
+                if token in self._all_skills:
+                    skill_tokens.add(token)
+        long_sentences = sum(
+            1 for sentence in QUICK_SENTENCE_PATTERN.split(section)
+            if len(QUICK_WORD_PATTERN.findall(sentence)) > 30
+        )
+        return SectionStats(
+            skill_tokens=frozenset(skill_tokens),
+            skills=frozenset(skill for skill in self._all_skills if skill in section_lower),
+            action_verbs=frozenset(verb for verb in self.action_verbs if verb in section_lower),
+            achievements=len(ACHIEVEMENT_PATTERN.findall(section)),
+            long_sentences=long_sentences
+        )
+
+    def _analyze_section(self, section, doc):
+        section_lower = section.lower()
+        return SectionStats(
+            # One parse per section: skills are matched against its tokens, lowercased
+            skill_tokens=frozenset(token.lower_ for token in doc if token.lower_ in self._all_skills),
+            skills=frozenset(skill for skill in self._all_skills if skill in section_lower),
+            action_verbs=frozenset(verb for verb in self.action_verbs if verb in section_lower),
+            achievements=len(ACHIEVEMENT_PATTERN.findall(section)),
+            long_sentences=sum(1 for sent in doc.sents if len(sent) > 30)
+        )
+
+    def calculate_ats_score(self, text, filename, stats=None):
+        if stats is None:
+            stats = self.section_stats(text)
+        
+        components = (
+            # 1. Keyword Match (25 pts)
+            self.analyze_keywords(text, stats),
+            # 2. Section Presence (10 pts)
+            self.analyze_sections(text),
+            # 3. Experience Relevance (15 pts)
+            self.analyze_experience(text, stats),
+            # 4. Formatting & Readability (10 pts)
+            self.analyze_formatting(text),
+            # 5. Grammar & Clarity (10 pts)
+            self.analyze_grammar(text, stats),
+            # 6. Contact Information (5 pts)
+            self.analyze_contact_info(text),
+            # 7. File Naming (5 pts)
+            self.analyze_filename(filename),
+            # 8. Customization (10 pts)
+            self.analyze_customization(text, stats)
+        )
+        
+        # The total score is summed by AtsResult
+        return AtsResult(components)
+
+    def analyze_keywords(self, text, stats=None):
         score = 0
         feedback = []
-        found_skills = set()
         
         # Check for skills
-        doc = self.nlp(text.lower())
-        for token in doc:
-            for category, skills in self.skills_dict.items():
-                if token.text in skills:
-                    found_skills.add(token.text)
+        if stats is None:
+            stats = self.section_stats(text)
+        found_skills = stats.skill_tokens
         
         # Score based on number of unique skills found
         unique_skills = len(found_skills)
         score = min(unique_skills * 2, 25)  # 2 points per skill, max 25
         
         if unique_skills < 5:
-            feedback.append("Add more technical skills to your resume")
+            feedback.append(Feedback.FEW_SKILLS)
         
-        return {'score': score, 'feedback': feedback}
+        return ComponentScore('keyword_match', score, tuple(feedback))
 
     def analyze_sections(self, text):
         score = 0
@@ -155,29 +383,30 @@ class ResumeAnalyzer:
             if any(keyword in text_lower for keyword in keywords):
                 score += 2  # 2 points per section, max 10
             else:
-                feedback.append(f"Missing {section_type} section")
+                feedback.append(MISSING_SECTION[section_type])
         
-        return {'score': score, 'feedback': feedback}
+        return ComponentScore('section_presence', score, tuple(feedback))
 
-    def analyze_experience(self, text):
+    def analyze_experience(self, text, stats=None):
         score = 0
         feedback = []
+        if stats is None:
+            stats = self.section_stats(text)
         
         # Check for action verbs
-        action_verb_count = sum(1 for verb in self.action_verbs if verb in text.lower())
+        action_verb_count = len(stats.action_verbs)
         score += min(action_verb_count, 5)  # Up to 5 points for action verbs
         
         # Check for quantified achievements
-        achievement_pattern = r'\d+%|\$\d+|\d+x|\d+ times'
-        achievements = re.findall(achievement_pattern, text)
-        score += min(len(achievements) * 2, 10)  # Up to 10 points for achievements
+        achievements = stats.achievements
+        score += min(achievements * 2, 10)  # Up to 10 points for achievements
         
         if action_verb_count < 3:
-            feedback.append("Add more action verbs to describe your experience")
-        if len(achievements) < 2:
-            feedback.append("Include more quantified achievements")
+            feedback.append(Feedback.FEW_ACTION_VERBS)
+        if achievements < 2:
+            feedback.append(Feedback.FEW_ACHIEVEMENTS)
         
-        return {'score': score, 'feedback': feedback}
+        return ComponentScore('experience_relevance', score, tuple(feedback))
 
     def analyze_formatting(self, text):
         score = 10  # Start with full points
@@ -186,29 +415,30 @@ class ResumeAnalyzer:
         # Check for tables (simple heuristic)
         if '|' in text or '\t' in text:
             score -= 2
-            feedback.append("Avoid using tables in your resume")
+            feedback.append(Feedback.USES_TABLES)
         
         # Check for multiple columns
         if text.count('\n') > 100:  # Simple heuristic for complex formatting
             score -= 2
-            feedback.append("Simplify your resume layout")
+            feedback.append(Feedback.COMPLEX_LAYOUT)
         
-        return {'score': max(0, score), 'feedback': feedback}
+        return ComponentScore('formatting', max(0, score), tuple(feedback))
 
-    def analyze_grammar(self, text):
+    def analyze_grammar(self, text, stats=None):
         score = 10  # Start with full points
         feedback = []
         
         # Basic grammar checks
-        doc = self.nlp(text)
+        if stats is None:
+            stats = self.section_stats(text)
         
         # Check sentence length
-        long_sentences = sum(1 for sent in doc.sents if len(sent) > 30)
+        long_sentences = stats.long_sentences
         if long_sentences > 3:
             score -= 2
-            feedback.append("Some sentences are too long")
+            feedback.append(Feedback.LONG_SENTENCES)
         
-        return {'score': max(0, score), 'feedback': feedback}
+        return ComponentScore('grammar', max(0, score), tuple(feedback))
 
     def analyze_contact_info(self, text):
         score = 0
@@ -230,9 +460,9 @@ class ResumeAnalyzer:
             score += 1
         
         if score < 3:
-            feedback.append("Add more contact information")
+            feedback.append(Feedback.INCOMPLETE_CONTACT)
         
-        return {'score': score, 'feedback': feedback}
+        return ComponentScore('contact_info', score, tuple(feedback))
 
     def analyze_filename(self, filename):
         score = 5  # Start with full points
@@ -241,16 +471,16 @@ class ResumeAnalyzer:
         # Check if filename contains name
         if not re.search(r'[A-Za-z]', filename):
             score -= 2
-            feedback.append("Include your name in the filename")
+            feedback.append(Feedback.FILENAME_NO_NAME)
         
         # Check if filename is too generic
         if filename.lower() in ['resume.pdf', 'cv.pdf']:
             score -= 3
-            feedback.append("Use a more specific filename (e.g., YourName_Resume.pdf)")
+            feedback.append(Feedback.FILENAME_GENERIC)
         
-        return {'score': max(0, score), 'feedback': feedback}
+        return ComponentScore('filename', max(0, score), tuple(feedback))
 
-    def analyze_customization(self, text):
+    def analyze_customization(self, text, stats=None):
         score = 10  # Start with full points
         feedback = []
 
@@ -260,7 +490,7 @@ class ResumeAnalyzer:
         # Heuristic 1: Check for adequate length
         if len(text) < 1000:
             score -= 3
-            feedback.append("Resume might be too brief; consider adding more detail and examples.")
+            feedback.append(Feedback.TOO_BRIEF)
         
         # Heuristic 2: Check for presence of diverse sections (already covered by section_presence, but reinforces customization)
         # This is a bit redundant with analyze_sections, but serves to emphasize customization quality.
@@ -272,24 +502,40 @@ class ResumeAnalyzer:
         
         if found_sections < 4:
             score -= 2
-            feedback.append("Ensure your resume includes key sections like Summary, Experience, Skills, and Education.")
+            feedback.append(Feedback.MISSING_KEY_SECTIONS)
 
         # Heuristic 3: Check for specific examples or quantified achievements (reinforces detail)
-        achievement_pattern = r'\d+%|\$\d+|\d+x|\d+ times'
-        achievements = re.findall(achievement_pattern, text)
-        if len(achievements) < 3:
+        if stats is not None:
+            achievements = stats.achievements
+        else:
+            achievements = len(ACHIEVEMENT_PATTERN.findall(text))
+        if achievements < 3:
             score -= 2
-            feedback.append("Quantify your achievements with numbers, percentages, or metrics whenever possible.")
-
-        return {'score': max(0, score), 'feedback': feedback}
-
-    def analyze_resume(self, pdf_path):
-        text = self.extract_text_from_pdf(pdf_path)
+            feedback.append(Feedback.FEW_METRICS)
+
+        return ComponentScore('customization', max(0, score), tuple(feedback))
+
+    def analyze_resume(self, pdf_path, content_hash=None, mode=FULL_MODE):
+        """Analyze a resume PDF and return an AnalysisResult"""
+        text = self.extract_text_from_pdf(pdf_path, content_hash)
+        return self.analyze_text(text, os.path.basename(pdf_path), mode)
+
+    def analyze_text(self, text, filename, mode=FULL_MODE):
+        if mode == QUICK_MODE:
+            # No spaCy at all; the result is flagged as approximate
+            stats = self.quick_stats(text)
+        elif mode == FULL_MODE:
+            # Unchanged sections of a previously seen resume come from the cache
+            stats = self.section_stats(text)
+            logger.info(f"Reused {stats.reused_sections} of {stats.sections} cached sections")
+        else:
+            raise ValueError(f"Unknown analysis mode: {mode!r}")
         
         # Calculate ATS score components
-        ats_analysis = self.calculate_ats_score(text, os.path.basename(pdf_path))
+        ats_analysis = self.calculate_ats_score(text, filename, stats)
         
         # Predict category
+        self.load_and_train_model()
         # Ensure resume_vec is transformed correctly
         if hasattr(self, 'vectorizer') and hasattr(self, 'classifier'):
             resume_vec = self.vectorizer.transform([text])
@@ -298,17 +544,8 @@ class ResumeAnalyzer:
             predicted_category = "General" # Default category if model not loaded
             print("Warning: TFIDF Vectorizer or Classifier not loaded. Model prediction skipped.")
 
-        # Generate overall assessment
-        overall_assessment = self.generate_overall_assessment(ats_analysis)
-
-        # Identify strengths
-        strengths = self.identify_strengths(ats_analysis)
-
-        # Identify improvements
-        improvements = self.generate_improvement_tips(ats_analysis)
-        
         # Extract skills for skills analysis
-        all_skills = self.extract_skills(text)
+        all_skills = self.extract_skills(text, stats)
         
         # Filter technical and soft skills based on the skills dictionary
         technical_skills = [s for s in all_skills if any(s in v for k, v in self.skills_dict.items() if k != 'soft_skills')]
@@ -320,57 +557,49 @@ class ResumeAnalyzer:
         # Generate job recommendations (placeholder)
         job_recommendations = self.generate_recommendations(predicted_category, all_skills)
 
-        response = {
-            'ats_score': ats_analysis['total_score'],
-            'score_breakdown': ats_analysis['scores'],
-            'analysis': {
-                'overall_assessment': overall_assessment,
-                'strengths': strengths,
-                'improvements': improvements
-            },
-            'job_recommendations': job_recommendations,
-            'skills_analysis': {
-                'technical': technical_skills,
-                'soft': soft_skills,
-                'missing': missing_skills
-            }
-        }
-        return response
+        # Assessment, strengths and improvement tips are rendered from the
+        # feedback codes by AnalysisResult.to_dict()
+        return AnalysisResult(
+            ats=ats_analysis,
+            predicted_category=str(predicted_category),
+            technical_skills=tuple(technical_skills),
+            soft_skills=tuple(soft_skills),
+            missing_skills=tuple(missing_skills),
+            job_recommendations=job_recommendations,
+            mode=mode
+        )
+
+    def analyze_texts(self, items, mode=FULL_MODE):
+        """Analyze (text, filename) pairs lazily, yielding an AnalysisResult for each"""
+        for text, filename in items:
+            yield self.analyze_text(text, filename, mode)
+
+    def triage(self, items, shortlist_size=None, min_score=None, fetch=None):
+        """Quick-scan every (text, filename) pair, then promote the shortlist to a full analysis.
+
+        The shortlist is the quick results scoring at least min_score, cut
+        down to the best shortlist_size. Items are read once, as they come,
+        and only the quick results are kept; fetch(index) is then called to
+        re-read the (text, filename) pair of each promoted item. It defaults
+        to items[index], so it must be given when items is an iterator.
+        Returns one result per item, in order: full results for the
+        shortlist and quick ones for the rest.
+        """
+        if fetch is None:
+            if not isinstance(items, Sequence):
+                raise TypeError("triage() needs fetch when items is not a sequence")
+            fetch = items.__getitem__
+        results = list(self.analyze_texts(items, QUICK_MODE))
+        for index in shortlist(results, shortlist_size, min_score):
+            text, filename = fetch(index)
+            results[index] = self.analyze_text(text, filename, FULL_MODE)
+        return results
 
     def generate_overall_assessment(self, ats_analysis):
-        score = ats_analysis['total_score']
-        if score >= 80:
-            return "Excellent! Your resume is highly optimized for ATS and presents a strong candidate profile."
-        elif score >= 60:
-            return "Good job! Your resume is generally well-optimized, but there's room for improvement in specific areas."
-        elif score >= 40:
-            return "Your resume has potential but needs significant optimization to pass ATS and attract recruiters."
-        else:
-            return "Your resume needs substantial work to meet modern ATS and recruiter expectations."
+        return overall_assessment(ats_analysis.total_score)
 
     def identify_strengths(self, ats_analysis):
-        strengths = []
-        if ats_analysis['scores']['keyword_match'] >= 20:
-            strengths.append("Strong keyword optimization, indicating a good match for target roles.")
-        if ats_analysis['scores']['section_presence'] >= 8:
-            strengths.append("All essential resume sections are present, ensuring comprehensive information.")
-        if ats_analysis['scores']['experience_relevance'] >= 10:
-            strengths.append("Well-articulated experience with quantifiable achievements and strong action verbs.")
-        if ats_analysis['scores']['formatting'] >= 8:
-            strengths.append("Clean and ATS-friendly formatting, enhancing readability.")
-        if ats_analysis['scores']['grammar'] >= 8:
-            strengths.append("Excellent grammar and clear, concise language.")
-        if ats_analysis['scores']['contact_info'] >= 4:
-            strengths.append("Complete and easily identifiable contact information.")
-        if ats_analysis['scores']['filename'] == 5:
-            strengths.append("Professional and appropriate filename.")
-        if ats_analysis['scores']['customization'] >= 7:
-            strengths.append("Resume appears well-customized and detailed.")
-        
-        if not strengths:
-            strengths.append("No specific strengths identified yet. Focus on all areas for improvement.")
-
-        return strengths
+        return strengths(ats_analysis)
 
     def identify_missing_skills(self, current_skills):
         # Define a general list of desirable skills that might be missing
@@ -391,66 +620,24 @@ class ResumeAnalyzer:
 
         return missing
 
-    def extract_skills(self, text):
-        doc = self.nlp(text.lower())
-        extracted_skills = set()
-        for category, skills in self.skills_dict.items():
-            for skill in skills:
-                if skill in text.lower():
-                    extracted_skills.add(skill)
-        return list(extracted_skills)
+    def extract_skills(self, text, stats=None):
+        if stats is None:
+            stats = self.section_stats(text)
+        return list(stats.skills)
 
     def generate_recommendations(self, role, skills):
         # This would typically come from a job database
         # For now, returning mock data
-        mock_jobs = [
-            {"title": "Software Engineer", "company": "Tech Solutions Inc.", "location": "San Francisco, CA", "match_score": 90, "link": "#"},
-            {"title": "Data Scientist", "company": "Quant Insights LLC", "location": "New York, NY", "match_score": 85, "link": "#"},
-            {"title": "Product Manager", "company": "Innovate Corp.", "location": "Seattle, WA", "match_score": 75, "link": "#"},
-            {"title": "UX Designer", "company": "Creative Studio", "location": "Austin, TX", "match_score": 70, "link": "#"},
-        ]
-        return mock_jobs
+        return JOB_RECOMMENDATIONS
 
     def generate_improvement_tips(self, ats_analysis):
-        tips = []
-        feedback = ats_analysis['feedback']
-
-        if "Add more technical skills to your resume" in feedback['keyword_match']:
-            tips.append("Strengthen your resume by integrating more industry-specific technical keywords relevant to your target roles.")
-        if "Missing summary section" in feedback['section_presence']:
-            tips.append("Include a concise professional summary or objective statement at the top of your resume.")
-        if "Missing skills section" in feedback['section_presence']:
-            tips.append("Add a dedicated skills section to highlight your technical and soft skills clearly.")
-        if "Missing experience section" in feedback['section_presence']:
-            tips.append("Ensure you have a detailed 'Experience' or 'Work History' section.")
-        if "Missing education section" in feedback['section_presence']:
-            tips.append("Include an 'Education' section with your degrees, institutions, and dates.")
-        if "Add more action verbs to describe your experience" in feedback['experience_relevance']:
-            tips.append("Use strong action verbs (e.g., 'Developed', 'Managed', 'Achieved') to describe your accomplishments.")
-        if "Include more quantified achievements" in feedback['experience_relevance']:
-            tips.append("Quantify your accomplishments with numbers, percentages, or metrics whenever possible.")
-        if "Avoid using tables in your resume" in feedback['formatting']:
-            tips.append("Remove tables and complex formatting elements that can be difficult for ATS to parse.")
-        if "Simplify your resume layout" in feedback['formatting']:
-            tips.append("Opt for a clean, simple, and standard resume layout for optimal ATS compatibility.")
-        if "Some sentences are too long" in feedback['grammar']:
-            tips.append("Break down long sentences for better readability and clarity.")
-        if "Add more contact information" in feedback['contact_info']:
-            tips.append("Ensure your resume includes essential contact details: email, phone number, and a LinkedIn profile URL.")
-        if "Include your name in the filename" in feedback['filename']:
-            tips.append("Rename your resume file to include your full name (e.g., 'JohnDoe_Resume.pdf').")
-        if "Use a more specific filename" in feedback['filename']:
-            tips.append("Avoid generic filenames like 'resume.pdf'; use a more descriptive name.")
-        if "Provide a job description to get a customization score." in feedback['customization']:
-            # This tip will now be removed since job description is not provided
-            pass
-        if "Tailor your resume more closely to the job description by including relevant keywords and phrases." in feedback['customization']:
-            tips.append("Review your resume to ensure it's well-detailed and comprehensively covers your experiences.")
-        
-        return tips
+        return improvement_tips(ats_analysis)
 
     def generate_feedback_pdf(self, analysis_data, output_path=None):
         """Generate a PDF report with the analysis results"""
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.pagesizes import letter
+
         if output_path:
             c = canvas.Canvas(output_path, pagesize=letter)
         else:
@@ -0,0 +1,111 @@
+"""Section-level memoization for incremental re-analysis.
+
+A resume is split into sections at lines that match one of the analyzer's
+section headers, and each section is parsed on its own. Its partial
+results (skill tokens, action verbs, quantified achievements, long
+sentences) are cached by a hash of the section text, so re-uploading a
+resume with one bullet changed only re-parses the section containing
+that bullet.
+
+Because no section's results depend on the text around it, merging the
+cached results of a resume gives exactly what parsing it from scratch
+would.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+DEFAULT_CACHE_SIZE = 4096
+
+
+@dataclass(slots=True, frozen=True)
+class SectionStats:
+    skill_tokens: frozenset  # skills that appear as a whole token
+    skills: frozenset  # skills that appear anywhere in the text
+    action_verbs: frozenset
+    achievements: int
+    long_sentences: int
+
+
+@dataclass(slots=True)
+class TextStats:
+    """The merged SectionStats of a whole resume"""
+    skill_tokens: frozenset
+    skills: frozenset
+    action_verbs: frozenset
+    achievements: int
+    long_sentences: int
+    sections: int
+    reused_sections: int
+
+    @classmethod
+    def merge(cls, stats, reused_sections=0):
+        return cls(
+            skill_tokens=frozenset().union(*(s.skill_tokens for s in stats)),
+            skills=frozenset().union(*(s.skills for s in stats)),
+            action_verbs=frozenset().union(*(s.action_verbs for s in stats)),
+            achievements=sum(s.achievements for s in stats),
+            long_sentences=sum(s.long_sentences for s in stats),
+            sections=len(stats),
+            reused_sections=reused_sections
+        )
+
+
+def split_sections(text, header_keywords):
+    """Split text into sections, each starting at a header line.
+
+    Joining the returned sections with '\\n' gives back the original text.
+    """
+    lines = text.split('\n')
+    sections = []
+    start = 0
+    for i, line in enumerate(lines):
+        if i > start and line.strip().rstrip(':').strip().lower() in header_keywords:
+            sections.append('\n'.join(lines[start:i]))
+            start = i
+    sections.append('\n'.join(lines[start:]))
+    return sections
+
+
+def section_key(section):
+    return hashlib.blake2b(section.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+
+class LRUCache:
+    """A small thread-safe least-recently-used cache"""
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,110 @@
+"""Fast serialization of analysis results.
+
+Two formats are supported:
+
+* JSON, in the wire schema served to the web UI (``dumps_json``)
+* a compact binary record for caches and bulk exports (``pack`` /
+  ``unpack``). Records are MessagePack, with feedback stored as enum codes
+  and the component names implied by their position.
+"""
+import json
+import struct
+
+import msgpack
+
+from .results import COMPONENTS, JOB_RECOMMENDATIONS, AnalysisResult, AtsResult, ComponentScore, Feedback
+
+# Bump when the layout of packed records changes
+RECORD_VERSION = 2
+
+_json_encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+
+def dumps_json(result, extra=None):
+    """Serialize an AnalysisResult (or an already rendered dict) to JSON bytes, adding any keys in extra"""
+    if isinstance(result, AnalysisResult):
+        result = result.to_dict()
+    return _json_encoder.encode({**result, **(extra or {})}).encode('utf-8')
+
+
+def to_record(result):
+    """Flatten an AnalysisResult into lists of primitives"""
+    ats = result.ats
+    jobs = None if result.job_recommendations is JOB_RECOMMENDATIONS else list(result.job_recommendations)
+    return [
+        RECORD_VERSION,
+        [c.score for c in ats.components],
+        [[int(code) for code in c.feedback] for c in ats.components],
+        result.predicted_category,
+        list(result.technical_skills),
+        list(result.soft_skills),
+        list(result.missing_skills),
+        jobs,
+        result.mode
+    ]
+
+
+def from_record(record):
+    """Rebuild an AnalysisResult from to_record() output"""
+    if record[0] != RECORD_VERSION:
+        raise ValueError(f"Unsupported record version: {record[0]}")
+    _, scores, feedback, category, technical, soft, missing, jobs, mode = record
+    components = tuple(
+        ComponentScore(name, score, tuple(Feedback(code) for code in codes))
+        for name, score, codes in zip(COMPONENTS, scores, feedback)
+    )
+    return AnalysisResult(
+        ats=AtsResult(components),
+        predicted_category=category,
+        technical_skills=tuple(technical),
+        soft_skills=tuple(soft),
+        missing_skills=tuple(missing),
+        job_recommendations=JOB_RECOMMENDATIONS if jobs is None else tuple(jobs),
+        mode=mode
+    )
+
+
+def pack(result):
+    """Serialize an AnalysisResult to a compact binary record"""
+    return packb(to_record(result))
+
+
+def unpack(data):
+    """Deserialize a record produced by pack()"""
+    return from_record(unpackb(data))
+
+
+def write_records(results, f):
+    """Write packed results to a binary file, each prefixed with its length"""
+    count = 0
+    for result in results:
+        data = pack(result)
+        f.write(struct.pack('<I', len(data)))
+        f.write(data)
+        count += 1
+    return count
+
+
+def read_records(f):
+    """Yield the AnalysisResults written by write_records()"""
+    while True:
+        header = f.read(4)
+        if not header:
+            return
+        if len(header) < 4:
+            raise ValueError("Truncated record header")
+        (length,) = struct.unpack('<I', header)
+        data = f.read(length)
+        if len(data) < length:
+            raise ValueError("Truncated record")
+        yield unpack(data)
+
+
+def packb(obj):
+    """Encode plain Python data as MessagePack"""
+    return msgpack.packb(obj, use_bin_type=True)
+
+
+def unpackb(data):
+    """Decode MessagePack produced by packb()"""
+    return msgpack.unpackb(data, raw=False)
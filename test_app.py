@@ -35,6 +35,27 @@ def test_endpoint(url, endpoint, timeout=30):
         print(f"❌ Error: {str(e)}")
         return False
 
+def wait_until_ready(url, timeout=120, interval=1):
+    """Poll /readyz and report how long the app takes to become ready"""
+    full_url = f"{url.rstrip('/')}/readyz"
+    start_time = time.time()
+    print(f"\nWaiting for {full_url}...")
+    while time.time() - start_time < timeout:
+        try:
+            response = requests.get(full_url, timeout=timeout)
+            if response.status_code == 200:
+                elapsed = time.time() - start_time
+                timings = response.json()
+                print(f"✅ Ready after {elapsed:.2f} seconds")
+                print(f"Server time-to-ready: {timings.get('time_to_ready_seconds')} seconds")
+                print(f"Server time-to-first-byte: {timings.get('time_to_first_byte_seconds')} seconds")
+                return True
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(interval)
+    print(f"❌ Error: Not ready after {timeout} seconds")
+    return False
+
 def test_deployment(url, name):
     """Test a deployment with better error handling"""
     print(f"\n{'='*50}")
@@ -45,6 +66,10 @@ def test_deployment(url, name):
     
     success = True
     
+    # Test liveness probe
+    if not test_endpoint(url, "/healthz"):
+        success = False
+    
     # Test main page
     if not test_endpoint(url, "/"):
         success = False
@@ -59,6 +84,10 @@ def test_deployment(url, name):
     if not test_endpoint(url, "/static/favicon.ico"):
         success = False
     
+    # Test readiness (models loaded and warmed up)
+    if not wait_until_ready(url):
+        success = False
+    
     print(f"\n{'='*50}")
     print(f"Overall Status: {'✅ All tests passed' if success else '❌ Some tests failed'}")
     print(f"{'='*50}\n")
@@ -0,0 +1,154 @@
+"""Quick mode, triage and the ?mode= parameter, none of which need spaCy"""
+import asyncio
+import io
+import json
+import threading
+
+import pytest
+
+from models.resume_analyzer import FULL_MODE, QUICK_MODE, ResumeAnalyzer
+
+RESUME = """Jane Doe
+jane@example.com | 555-123-4567
+Summary
+Engineer working with python, c++ and scikit-learn.
+Experience
+- Developed a node-based python-docker pipeline that increased throughput by 40%.
+- Led a team of 5 and cut costs by $20000, delivering 3x faster releases.
+- """ + ' '.join(['word'] * 35) + """
+Skills
+SQL, Kubernetes, (AWS), teamwork"""
+
+
+@pytest.fixture
+def analyzer():
+    pytest.importorskip('sklearn')
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+
+    analyzer = ResumeAnalyzer(lazy=True)
+    # A tiny classifier instead of fitting on the dataset
+    texts = ['python sql pandas data', 'recruiting payroll onboarding', 'python numpy models', 'hiring people']
+    analyzer.vectorizer = TfidfVectorizer().fit(texts)
+    analyzer.classifier = LogisticRegression(solver='liblinear').fit(
+        analyzer.vectorizer.transform(texts), ['Data Science', 'HR', 'Data Science', 'HR']
+    )
+    analyzer._model_ready = True
+    return analyzer
+
+
+class QuickOnlyAnalyzer(ResumeAnalyzer):
+    """Stands in quick_stats() for spaCy, recording which texts got a full analysis"""
+
+    def __init__(self, analyzer):
+        super().__init__(lazy=True)
+        self.vectorizer, self.classifier, self._model_ready = analyzer.vectorizer, analyzer.classifier, True
+        self.full_analyses = []
+
+    def section_stats(self, text):
+        self.full_analyses.append(text)
+        return self.quick_stats(text)
+
+
+def test_quick_stats(analyzer):
+    stats = analyzer.quick_stats(RESUME)
+    # Infix hyphens split tokens, as spaCy's tokenizer does, so scikit-learn
+    # is only found by the substring match
+    assert stats.skill_tokens == {'python', 'c++', 'docker', 'sql', 'kubernetes', 'aws', 'teamwork'}
+    assert {'scikit-learn', 'c++', 'docker', 'aws'} <= stats.skills
+    assert stats.action_verbs == {'developed', 'increased', 'led'}
+    assert stats.achievements == 3
+    assert stats.long_sentences == 1
+    assert (stats.sections, stats.reused_sections) == (4, 0)
+
+
+def test_quick_sentences_end_at_section_boundaries(analyzer):
+    text = 'Summary\n' + ' '.join(['word'] * 20) + '\nExperience\n' + ' '.join(['word'] * 20)
+    assert analyzer.quick_stats(text).long_sentences == 0
+    assert analyzer.quick_stats(text.replace('\nExperience\n', ' ')).long_sentences == 1
+
+
+def test_quick_mode_never_loads_spacy(analyzer):
+    result = analyzer.analyze_text(RESUME, 'Jane_Doe_Resume.pdf', QUICK_MODE)
+    assert analyzer._nlp is None
+    assert result.mode == QUICK_MODE and result.approximate
+    assert result.predicted_category == 'Data Science'
+    assert 'python' in result.technical_skills and 'teamwork' in result.soft_skills
+    with pytest.raises(ValueError):
+        analyzer.analyze_text(RESUME, 'Jane_Doe_Resume.pdf', 'fast')
+
+
+def test_classifier_does_not_wait_for_spacy(analyzer):
+    analyzer._model_ready = False
+    analyzer._train_model = lambda: None
+    with analyzer._nlp_lock:  # as if spaCy were loading in another thread
+        done = threading.Event()
+        threading.Thread(target=lambda: analyzer.load_and_train_model() or done.set(), daemon=True).start()
+        assert done.wait(5)
+    assert analyzer._model_ready
+
+
+def test_approximate_results_are_flagged(analyzer):
+    quick = analyzer.analyze_text(RESUME, 'Jane_Doe_Resume.pdf', QUICK_MODE).to_dict()
+    assert (quick['mode'], quick['approximate']) == (QUICK_MODE, True)
+
+    full = QuickOnlyAnalyzer(analyzer).analyze_text(RESUME, 'Jane_Doe_Resume.pdf', FULL_MODE)
+    assert full.mode == FULL_MODE and not full.approximate
+    assert 'mode' not in full.to_dict() and 'approximate' not in full.to_dict()
+
+
+def test_triage_promotes_the_shortlist(analyzer):
+    triager = QuickOnlyAnalyzer(analyzer)
+    items = [('Jane Doe', 'resume.pdf'), (RESUME, 'Jane_Doe_Resume.pdf'), ('python sql', 'a.pdf'), (RESUME, 'b.pdf')]
+    results = triager.triage(items, shortlist_size=1)
+    assert [r.mode for r in results] == [QUICK_MODE, FULL_MODE, QUICK_MODE, QUICK_MODE]
+    assert triager.full_analyses == [RESUME]
+    assert results[1].ats == triager.analyze_text(RESUME, 'Jane_Doe_Resume.pdf', QUICK_MODE).ats
+
+    triager.full_analyses.clear()
+    results = triager.triage(items, min_score=results[1].ats.total_score)
+    assert [r.mode for r in results] == [QUICK_MODE, FULL_MODE, QUICK_MODE, FULL_MODE]
+    assert triager.full_analyses == [RESUME, RESUME]
+
+
+def test_triage_refetches_from_iterators(analyzer):
+    triager = QuickOnlyAnalyzer(analyzer)
+    items = [('Jane Doe', 'resume.pdf'), (RESUME, 'Jane_Doe_Resume.pdf')]
+    with pytest.raises(TypeError):
+        triager.triage(iter(items))
+    fetched = []
+    results = triager.triage(iter(items), shortlist_size=1, fetch=lambda i: fetched.append(i) or items[i])
+    assert fetched == [1]
+    assert [r.mode for r in results] == [QUICK_MODE, FULL_MODE]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    import app
+
+    # Requests would otherwise start loading the models
+    monkeypatch.setattr(app, 'start_analyzer', lambda wait=False: None)
+    return app.app.test_client()
+
+
+def test_flask_rejects_unknown_mode(client):
+    response = client.post('/analyze?mode=fast', data={'file': (io.BytesIO(b'%PDF-1.4'), 'resume.pdf')})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Invalid mode. Use one of: full, quick'
+
+
+def test_asgi_rejects_unknown_mode():
+    import asgi
+
+    sent = []
+
+    async def receive():
+        raise AssertionError("the body should not be read")
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'method': 'POST', 'path': '/analyze', 'query_string': b'mode=fast', 'headers': []}
+    asyncio.run(asgi.analyze(scope, receive, send))
+    assert sent[0]['status'] == 400
+    assert json.loads(sent[1]['body'])['error'] == 'Invalid mode. Use one of: full, quick'
@@ -0,0 +1,226 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+
+import pytest
+
+import asgi
+from asgi import MultipartParser, UploadError
+from werkzeug.datastructures import Headers
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BOUNDARY = b'----scanlyticboundary'
+
+
+def multipart_body(parts, boundary=BOUNDARY):
+    body = b'preamble\r\n'
+    for headers, data in parts:
+        body += b'--' + boundary + b'\r\n' + headers + b'\r\n\r\n' + data + b'\r\n'
+    return body + b'--' + boundary + b'--\r\nepilogue'
+
+
+def file_part(data, filename=b'resume.pdf', name=b'file'):
+    headers = b'Content-Disposition: form-data; name="' + name + b'"; filename="' + filename + b'"'
+    return headers + b'\r\nContent-Type: application/pdf', data
+
+
+def parse(body, chunks):
+    parts = []
+    parser = MultipartParser(
+        BOUNDARY,
+        lambda headers: parts.append([headers, b'']),
+        lambda data: parts[-1].__setitem__(1, parts[-1][1] + data),
+        lambda: None
+    )
+    for chunk in chunks:
+        parser.feed(chunk)
+    parser.finish()
+    return parts
+
+
+def random_chunks(body, rng, max_size):
+    chunks, start = [], 0
+    while start < len(body):
+        size = rng.randint(1, max_size)
+        chunks.append(body[start:start + size])
+        start += size
+    return chunks
+
+
+# Part bodies that contain partial boundaries, CRLFs and dashes
+PAYLOADS = [
+    b'',
+    b'%PDF-1.4 plain body',
+    b'\r\n--' + BOUNDARY[:-1] + b'x\r\n--\r\n-',
+    bytes(range(256)) * 40,
+]
+
+
+@pytest.mark.parametrize('seed', range(25))
+def test_parser_survives_any_chunking(seed):
+    rng = random.Random(seed)
+    parts = [(b'Content-Disposition: form-data; name="note"', b'hello')] + [file_part(p) for p in PAYLOADS]
+    body = multipart_body(parts)
+    expected = [data for _, data in parts]
+
+    for max_size in (1, 7, len(BOUNDARY) + 3, 4096):
+        parsed = parse(body, random_chunks(body, rng, max_size))
+        assert [data for _, data in parsed] == expected
+        assert parsed[1][0].get('Content-Type') == 'application/pdf'
+
+
+def test_parser_rejects_malformed_bodies():
+    with pytest.raises(UploadError):
+        parse(multipart_body([file_part(b'data')])[:-30], [multipart_body([file_part(b'data')])[:-30]])
+    with pytest.raises(UploadError):
+        parse(b'--' + BOUNDARY + b'xx', [b'--' + BOUNDARY + b'xx'])
+    big_headers = b'--' + BOUNDARY + b'\r\n' + b'X' * (asgi.MAX_HEADER_SIZE + 1)
+    with pytest.raises(UploadError):
+        parse(big_headers, [big_headers])
+
+
+def upload_headers(body):
+    return Headers({
+        'Content-Type': 'multipart/form-data; boundary=' + BOUNDARY.decode(),
+        'Content-Length': str(len(body))
+    })
+
+
+def body_messages(chunks, complete=True):
+    async def receive():
+        if chunks:
+            chunk = chunks.pop(0)
+            return {'type': 'http.request', 'body': chunk, 'more_body': bool(chunks) or not complete}
+        await asyncio.sleep(3600)
+    return receive
+
+
+@pytest.mark.parametrize('write_buffer', [1000, asgi.UPLOAD_WRITE_BUFFER])
+def test_receive_upload_writes_hashed_file(monkeypatch, write_buffer):
+    monkeypatch.setattr(asgi, 'UPLOAD_WRITE_BUFFER', write_buffer)
+    writers = set()
+    write = asgi.UploadReceiver._write
+    monkeypatch.setattr(asgi.UploadReceiver, '_write',
+                        lambda self, *args: writers.add(threading.current_thread()) or write(self, *args))
+
+    data = os.urandom(100_000)
+    body = multipart_body([file_part(data)])
+    upload = asyncio.run(asgi.receive_upload(body_messages(random_chunks(body, random.Random(0), 5000)),
+                                             upload_headers(body)))
+    try:
+        assert upload.filename == 'resume.pdf'
+        with open(upload.filepath, 'rb') as f:
+            assert f.read() == data
+        assert upload.size == len(data)
+        assert upload.digest.hexdigest() == hashlib.sha256(data).hexdigest()
+    finally:
+        upload.cleanup()
+    assert not os.path.exists(upload.filepath)
+    assert writers and threading.main_thread() not in writers
+
+
+def test_receive_upload_writes_empty_files():
+    body = multipart_body([file_part(b'')])
+    upload = asyncio.run(asgi.receive_upload(body_messages([body]), upload_headers(body)))
+    try:
+        assert os.path.getsize(upload.filepath) == 0
+    finally:
+        upload.cleanup()
+
+
+def test_receive_upload_times_out_stalled_clients(monkeypatch):
+    monkeypatch.setattr(asgi, 'UPLOAD_IDLE_TIMEOUT', 0.05)
+    body = multipart_body([file_part(b'data')])
+    receive = body_messages([body[:40]], complete=False)  # then nothing more arrives
+    with pytest.raises(UploadError) as error:
+        asyncio.run(asgi.receive_upload(receive, upload_headers(body)))
+    assert error.value.status == 408
+
+
+def test_receive_upload_enforces_total_deadline(monkeypatch):
+    monkeypatch.setattr(asgi, 'UPLOAD_TIMEOUT', 0.2)
+    body = multipart_body([file_part(b'x' * 1000)])
+
+    async def trickle():
+        await asyncio.sleep(0.01)
+        return {'type': 'http.request', 'body': b'', 'more_body': True}
+
+    with pytest.raises(UploadError) as error:
+        asyncio.run(asgi.receive_upload(trickle, upload_headers(body)))
+    assert error.value.status == 408
+
+
+def test_receive_upload_rejects_oversized_stream(monkeypatch):
+    monkeypatch.setattr(asgi, 'MAX_CONTENT_LENGTH', 1000)
+    body = multipart_body([file_part(b'x' * 2000)])
+    headers = upload_headers(body)
+    del headers['Content-Length']
+    with pytest.raises(UploadError) as error:
+        asyncio.run(asgi.receive_upload(body_messages([body[i:i + 100] for i in range(0, len(body), 100)]), headers))
+    assert error.value.status == 413
+
+
+@pytest.mark.parametrize('slots', ['compute_slots', 'upload_slots'])
+def test_full_queue_rejects_before_reading_body(monkeypatch, slots):
+    monkeypatch.setattr(asgi, slots, asgi.Slots(0))
+    sent = []
+
+    async def receive():
+        raise AssertionError("the body should not be read")
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'method': 'POST', 'path': '/analyze', 'query_string': b'', 'headers': [
+        (b'content-type', b'multipart/form-data; boundary=' + BOUNDARY)
+    ]}
+    asyncio.run(asgi.analyze(scope, receive, send))
+    assert sent[0]['status'] == 503
+    assert json.loads(sent[1]['body'])['error'].startswith('Server is busy')
+
+
+def test_upload_slot_is_released(monkeypatch):
+    monkeypatch.setattr(asgi, 'upload_slots', asgi.Slots(1))
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    body = multipart_body([(b'Content-Disposition: form-data; name="note"', b'no file')])
+    scope = {'type': 'http', 'method': 'POST', 'path': '/analyze', 'query_string': b'',
+             'headers': [(k.lower().encode(), v.encode()) for k, v in upload_headers(body).items()]}
+    for _ in range(2):
+        asyncio.run(asgi.analyze(scope, body_messages([body]), send))
+        assert sent[-2]['status'] == 400
+    assert asgi.upload_slots.in_use == 0
+
+
+def test_import_does_not_load_models():
+    code = ("import threading, asgi; "
+            "assert asgi.flask_app._loader is None; "
+            "assert 'analyzer-load' not in [t.name for t in threading.enumerate()]")
+    subprocess.run([sys.executable, '-c', code], check=True, cwd=ROOT)
+
+
+def test_lifespan_startup_starts_loader(monkeypatch):
+    started = threading.Event()
+    monkeypatch.setattr(asgi.flask_app, '_loader', None)
+    monkeypatch.setattr(asgi.flask_app, 'load_analyzer', started.set)
+    messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message['type'])
+
+    monkeypatch.setattr(asgi, 'executor', asgi.ThreadPoolExecutor(max_workers=1))
+    asyncio.run(asgi.lifespan(receive, send))
+    assert sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+    assert started.wait(5)
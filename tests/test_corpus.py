@@ -0,0 +1,69 @@
+import csv
+import os
+
+import pytest
+
+from models import corpus
+from models.corpus import ColumnarCorpus, convert_csv
+
+ROWS = [
+    ('Data Science', 'Python, pandas and café ☕ analytics'),
+    ('HR', 'Recruiting, "onboarding", payroll\nand training'),
+    ('Data Science', ''),
+    ('Testing', 'Selenium ' * 500),
+]
+
+
+def write_csv(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Category', 'Resume'])
+        writer.writerows(rows)
+    return str(path)
+
+
+def test_csv_round_trip(tmp_path):
+    output = str(tmp_path / 'corpus')
+    assert convert_csv(write_csv(tmp_path / 'resumes.csv', ROWS), output) == len(ROWS)
+    with ColumnarCorpus(output) as c:
+        assert len(c) == len(ROWS)
+        assert c.categories == ['Data Science', 'HR', 'Testing']
+        assert [(c.category(i), c.resume(i)) for i in range(len(c))] == ROWS
+        assert list(c.iter_resumes(start=1, stop=3)) == [ROWS[1][1], ROWS[2][1]]
+        assert list(c.category_labels()) == [category for category, _ in ROWS]
+
+
+def test_empty_corpus(tmp_path):
+    output = str(tmp_path / 'corpus')
+    assert convert_csv(write_csv(tmp_path / 'resumes.csv', []), output) == 0
+    with ColumnarCorpus(output) as c:
+        assert len(c) == 0
+        assert c.categories == []
+        assert list(c.iter_resumes()) == []
+        assert len(c.category_labels()) == 0
+
+
+def test_failed_conversion_keeps_the_old_corpus(tmp_path, monkeypatch):
+    output = str(tmp_path / 'corpus')
+    convert_csv(write_csv(tmp_path / 'old.csv', ROWS[:2]), output)
+    before = {name: (tmp_path / 'corpus' / name).read_bytes() for name in os.listdir(output)}
+
+    def fail_after_blob(csv_path, output_dir, *args):
+        with open(os.path.join(output_dir, corpus.BLOB_FILE), 'wb') as f:
+            f.write(b'partial')
+        raise OSError("disk full")
+
+    monkeypatch.setattr(corpus, '_write_corpus', fail_after_blob)
+    with pytest.raises(OSError):
+        convert_csv(write_csv(tmp_path / 'new.csv', ROWS), output)
+    assert {name: (tmp_path / 'corpus' / name).read_bytes() for name in os.listdir(output)} == before
+    assert sorted(os.listdir(tmp_path)) == ['corpus', 'new.csv', 'old.csv']
+
+
+def test_reconversion_replaces_the_corpus(tmp_path):
+    output = str(tmp_path / 'corpus')
+    convert_csv(write_csv(tmp_path / 'old.csv', ROWS), output)
+    convert_csv(write_csv(tmp_path / 'new.csv', ROWS[1:2]), output)
+    with ColumnarCorpus(output) as c:
+        assert [(c.category(i), c.resume(i)) for i in range(len(c))] == ROWS[1:2]
+    assert sorted(os.listdir(tmp_path)) == ['corpus', 'new.csv', 'old.csv']
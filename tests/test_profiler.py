@@ -0,0 +1,136 @@
+import json
+import os
+import time
+from collections import Counter
+
+import pytest
+
+from models.profiler import (
+    ProfileStore, SamplingProfiler, is_valid_profile_id, is_valid_request_id, new_profile_id, new_request_id
+)
+
+MAIN = ('/app/app.py', 10, 'analyze')
+PARSE = ('/app/models/resume_analyzer.py', 20, 'parse')
+RECURSE = ('/app/models/resume_analyzer.py', 30, 'walk;tree')
+
+
+def make_profiler(stacks):
+    profiler = SamplingProfiler()
+    profiler.stacks = Counter(stacks)
+    profiler.samples = sum(profiler.stacks.values())
+    profiler.duration = 0.5
+    return profiler
+
+
+def test_folded_stacks():
+    profiler = make_profiler({(MAIN, PARSE): 3, (MAIN,): 1, (MAIN, RECURSE, RECURSE): 2})
+    assert profiler.folded().splitlines() == [
+        'analyze (app.py:10);parse (resume_analyzer.py:20) 3',
+        # ';' inside a frame name would split the frame, so it is replaced
+        'analyze (app.py:10);walk:tree (resume_analyzer.py:30);walk:tree (resume_analyzer.py:30) 2',
+        'analyze (app.py:10) 1',
+    ]
+    assert make_profiler({}).folded() == ''
+
+
+def test_top_functions():
+    profiler = make_profiler({(MAIN, PARSE): 3, (MAIN,): 1, (MAIN, RECURSE, RECURSE): 2})
+    top = profiler.top_functions()
+    assert [(t['function'], t['self_samples'], t['total_samples']) for t in top] == [
+        ('parse', 3, 3),
+        ('walk;tree', 2, 2),  # recursion counts once per sample
+        ('analyze', 1, 6),
+    ]
+    assert top[0]['self_percent'] == 50.0 and top[2]['total_percent'] == 100.0
+    assert len(profiler.top_functions(limit=1)) == 1
+    summary = profiler.summary()
+    assert (summary['samples'], summary['duration_ms']) == (6, 500.0)
+
+
+def test_samples_the_target_thread():
+    def busy():
+        deadline = time.perf_counter() + 0.2
+        while time.perf_counter() < deadline:
+            pass
+
+    with SamplingProfiler() as profiler:
+        busy()
+    assert profiler.samples > 0
+    assert any(frame[2] == 'busy' for stack in profiler.stacks for frame in stack)
+    assert 'busy (test_profiler.py:' in profiler.folded()
+
+
+@pytest.mark.parametrize('request_id, valid', [
+    (new_request_id(), True),
+    ('client-Trace_01', True),
+    ('x' * 64, True),
+    ('x' * 65, False),
+    ('', False),
+    (None, False),
+    ('../etc/passwd', False),
+    ('a/b', False),
+    ('abc\n', False),
+])
+def test_is_valid_request_id(request_id, valid):
+    assert is_valid_request_id(request_id) is valid
+
+
+@pytest.mark.parametrize('profile_id, valid', [
+    (new_profile_id(), True),
+    ('0' * 32, True),
+    ('0' * 31, False),
+    ('A' * 32, False),
+    ('client-Trace_01', False),
+    ('../' + '0' * 29, False),
+    ('0' * 32 + '\n', False),
+])
+def test_is_valid_profile_id(profile_id, valid):
+    assert is_valid_profile_id(profile_id) is valid
+
+
+def test_store_rejects_unsafe_paths(tmp_path):
+    store = ProfileStore(str(tmp_path))
+    for profile_id in ('../secret', '/etc/passwd', 'client-chosen-id'):
+        with pytest.raises(ValueError):
+            store._path(profile_id, 'json')
+        assert store.folded_path(profile_id) is None
+        assert store.load_summary(profile_id) is None
+
+
+def test_store_generates_profile_ids(tmp_path):
+    store = ProfileStore(str(tmp_path))
+    profiler = make_profiler({(MAIN, PARSE): 3})
+    first = store.save(profiler, 'same-request')
+    second = store.save(profiler, 'same-request')
+    assert first['profile_id'] != second['profile_id']
+    assert first['request_id'] == 'same-request'
+    assert store.load_summary(first['profile_id']) == json.loads(json.dumps(first))
+    with open(store.folded_path(second['profile_id']), encoding='utf-8') as f:
+        assert f.read() == profiler.folded()
+
+
+def test_store_prunes_old_and_excess_profiles(tmp_path):
+    store = ProfileStore(str(tmp_path), max_profiles=10, max_age=3600)
+    profiler = make_profiler({(MAIN,): 1})
+    ids = [store.save(profiler)['profile_id'] for _ in range(5)]
+    now = time.time()
+    for age, profile_id in enumerate(reversed(ids)):
+        for extension in ('json', 'folded'):
+            os.utime(store._path(profile_id, extension), (now - age, now - age))
+
+    store.max_profiles = 3
+    assert store.prune(now=now) == 2
+    assert [p for p in ids if store.load_summary(p)] == ids[-3:]
+
+    # ids[-3] is two seconds old, so it expires first
+    assert store.prune(now=now + 3598.5) == 1
+    assert [p for p in ids if store.load_summary(p)] == ids[-2:]
+    assert sorted(os.listdir(tmp_path)) == sorted(f"{p}.{e}" for p in ids[-2:] for e in ('json', 'folded'))
+
+
+def test_save_prunes(tmp_path):
+    store = ProfileStore(str(tmp_path), max_profiles=2)
+    profiler = make_profiler({(MAIN,): 1})
+    for _ in range(4):
+        store.save(profiler)
+    assert len(os.listdir(tmp_path)) == 4  # two profiles, two files each
@@ -0,0 +1,101 @@
+import os
+from dataclasses import replace
+
+import pytest
+
+from models.sections import LRUCache, split_sections
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEADERS = frozenset({'summary', 'skills', 'experience', 'education'})
+
+
+@pytest.mark.parametrize('text', [
+    '',
+    'John Doe',
+    'John Doe\nSummary\nEngineer\n\nSkills:\nPython\nEXPERIENCE\nLed a team\n',
+    'Skills\nSkills\n  education  \n',
+])
+def test_split_sections_round_trip(text):
+    sections = split_sections(text, HEADERS)
+    assert '\n'.join(sections) == text
+    for section in sections[1:]:
+        assert section.split('\n')[0].strip().rstrip(':').strip().lower() in HEADERS
+
+
+def test_split_sections_starts_at_headers():
+    text = 'John Doe\nSummary\nEngineer\nSkills:\nPython'
+    assert split_sections(text, HEADERS) == ['John Doe', 'Summary\nEngineer', 'Skills:\nPython']
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+@pytest.fixture(scope='module')
+def blank_nlp():
+    spacy = pytest.importorskip('spacy')
+    nlp = spacy.blank('en')
+    nlp.add_pipe('sentencizer')
+    return nlp
+
+
+RESUME = """Jane Doe
+jane@example.com
+Summary
+Engineer who likes python and docker. Led a team of 5 people to deliver a platform used by many customers across
+several regions while keeping costs, latency, error rates, on-call load and release times down for every product team.
+Experience
+- Developed a python service that increased throughput by 40%.
+- Optimized sql queries and reduced latency by 200ms.
+Skills
+Python, SQL, Docker, Kubernetes, teamwork"""
+
+
+def test_warm_and_edited_runs_match_cold_runs(blank_nlp):
+    from models.resume_analyzer import ResumeAnalyzer
+
+    cached = ResumeAnalyzer(lazy=True, nlp=blank_nlp)
+    cold = ResumeAnalyzer(lazy=True, cache_size=0, nlp=blank_nlp)
+    edited = RESUME.replace('increased throughput by 40%', 'increased throughput by 45% using redis')
+
+    first = cached.section_stats(RESUME)
+    assert first.long_sentences == 1 and 'python' in first.skill_tokens
+    assert (first.sections, first.reused_sections) == (4, 0)
+
+    assert cached.section_stats(RESUME) == replace(cold.section_stats(RESUME), reused_sections=4)
+
+    after_edit = cached.section_stats(edited)
+    assert after_edit.reused_sections == 3  # only the Experience section is parsed again
+    reference = cold.section_stats(edited)
+    assert after_edit == replace(reference, reused_sections=3)
+    assert 'redis' in after_edit.skill_tokens
+    assert cached.calculate_ats_score(edited, 'Jane_Doe_Resume.pdf', after_edit) == \
+        cold.calculate_ats_score(edited, 'Jane_Doe_Resume.pdf', reference)
+
+
+def test_sentences_end_at_section_boundaries(blank_nlp):
+    from models.resume_analyzer import ResumeAnalyzer
+
+    analyzer = ResumeAnalyzer(lazy=True, cache_size=0, nlp=blank_nlp)
+    # 20 words with no full stop, then a header: one sentence each side
+    text = 'Summary\n' + ' '.join(['word'] * 20) + '\nExperience\n' + ' '.join(['word'] * 20)
+    assert analyzer.section_stats(text).long_sentences == 0
+    assert analyzer.section_stats(text.replace('\nExperience\n', ' ')).long_sentences == 1
+
+
+def test_corpus_equivalence(tmp_path, blank_nlp):
+    from models.corpus import convert_csv, equivalence
+    from models.resume_analyzer import DATASET_PATH
+
+    corpus_path = str(tmp_path / 'corpus')
+    convert_csv(os.path.join(ROOT, DATASET_PATH), corpus_path)
+    report = equivalence(corpus_path, limit=int(os.environ.get('EQUIVALENCE_LIMIT', 100)), nlp=blank_nlp)
+    assert report['resumes'] > 0 and report['reused_sections'] > 0
+    assert report['mismatches'] == []
@@ -0,0 +1,72 @@
+import io
+import json
+
+import pytest
+
+from models import serialization
+from models.results import COMPONENTS, JOB_RECOMMENDATIONS, AnalysisResult, AtsResult, ComponentScore, Feedback
+from models.serialization import dumps_json, pack, read_records, unpack, write_records
+
+
+def make_result(mode='full', jobs=JOB_RECOMMENDATIONS):
+    components = tuple(
+        ComponentScore(name, score, feedback)
+        for name, score, feedback in zip(COMPONENTS, (20, 8, 5, 10, 8, 4, 0, 7), (
+            (), (Feedback.MISSING_PROJECTS,), (Feedback.FEW_ACTION_VERBS, Feedback.FEW_ACHIEVEMENTS),
+            (), (Feedback.LONG_SENTENCES,), (Feedback.INCOMPLETE_CONTACT,),
+            (Feedback.FILENAME_NO_NAME, Feedback.FILENAME_GENERIC), (Feedback.FEW_METRICS,)
+        ))
+    )
+    return AnalysisResult(
+        ats=AtsResult(components),
+        predicted_category='Data Science',
+        technical_skills=('python', 'sql', 'c++'),
+        soft_skills=('leadership',),
+        missing_skills=('docker', 'café'),
+        job_recommendations=jobs,
+        mode=mode
+    )
+
+
+@pytest.mark.parametrize('result', [
+    make_result(),
+    make_result(mode='quick'),
+    make_result(jobs=({'title': 'Analyst "II"', 'match_score': 60},)),
+])
+def test_dumps_json_matches_to_dict(result):
+    assert json.loads(dumps_json(result)) == result.to_dict()
+    assert dumps_json(result) == dumps_json(result.to_dict())
+    extra = {'profile': {'request_id': 'abc', 'samples': 3}}
+    assert json.loads(dumps_json(result, extra)) == {**result.to_dict(), **extra}
+
+
+def test_dumps_json_extra_keys_replace_result_keys():
+    body = dumps_json(make_result(mode='quick'), {'mode': 'override'})
+    assert body.count(b'"mode"') == 1
+    assert json.loads(body)['mode'] == 'override'
+
+
+def test_record_round_trip():
+    results = [make_result(), make_result(mode='quick', jobs=())]
+    assert [unpack(pack(result)) for result in results] == results
+
+    f = io.BytesIO()
+    assert write_records(results, f) == 2
+    f.seek(0)
+    assert list(read_records(f)) == results
+
+
+def test_truncated_records():
+    f = io.BytesIO()
+    write_records([make_result()], f)
+    data = f.getvalue()
+    for cut in (2, len(data) - 1):
+        with pytest.raises(ValueError):
+            list(read_records(io.BytesIO(data[:cut])))
+
+
+def test_unknown_record_version():
+    record = serialization.to_record(make_result())
+    record[0] = serialization.RECORD_VERSION + 1
+    with pytest.raises(ValueError):
+        serialization.from_record(record)